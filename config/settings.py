@@ -12,6 +12,8 @@ class Settings:
     # HubSpot API Configuration
     HUBSPOT_ACCESS_TOKEN: str = os.getenv("HUBSPOT_ACCESS_TOKEN", "")
     HUBSPOT_BASE_URL: str = "https://api.hubapi.com"
+    # App client secret, used to verify webhook signatures (webhooks are rejected without it)
+    HUBSPOT_CLIENT_SECRET: str = os.getenv("HUBSPOT_CLIENT_SECRET", "")
     
     # API Configuration
     API_TITLE: str = "HubSpot Claude Middleware"
@@ -32,6 +34,11 @@ class Settings:
     
     # Cache Configuration
     CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", 300))  # 5 minutes
+    # Discovered value mappings, saved across restarts (defaults to the project root, not the working directory)
+    VALUE_CACHE_FILE: str = os.getenv(
+        "VALUE_CACHE_FILE",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".value_cache.json")
+    )
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
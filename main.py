@@ -1,9 +1,15 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
 import json
+import base64
+import hashlib
+import hmac
+import re
+import time
+from config.settings import settings
 from services.hubspot_client import HubSpotClient
 from services.translator import PropertyTranslator
 from services.query_parser import QueryParser
@@ -37,6 +43,25 @@ encyclopedia = EncyclopediaService()
 encyclopedia_resolver = EncyclopediaResolver()
 hierarchical_resolver = HierarchicalEncyclopediaResolver()
 
+# Webhook requests signed longer ago than this are rejected as replays
+_WEBHOOK_MAX_AGE_MS = 5 * 60 * 1000
+# Escapes HubSpot decodes in the request URI before signing it (X-HubSpot-Signature-v3)
+_WEBHOOK_URI_DECODES = {
+    "%3A": ":", "%2F": "/", "%3F": "?", "%40": "@", "%21": "!", "%24": "$",
+    "%27": "'", "%28": "(", "%29": ")", "%2A": "*", "%2C": ",", "%3B": ";"
+}
+_WEBHOOK_URI_DECODE_RE = re.compile("|".join(_WEBHOOK_URI_DECODES), re.IGNORECASE)
+
+@app.on_event("startup")
+async def startup():
+    # Warm the hierarchical encyclopedia off the event loop instead of at import time
+    await hierarchical_resolver.load_hierarchical_cache()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Release the HubSpot connection pool shared by all services
+    await HubSpotClient.aclose()
+
 class CompanyQuery(BaseModel):
     query: str
     limit: Optional[int] = 200
@@ -70,10 +95,7 @@ async def search_companies(query: CompanyQuery):
         )
         
         # Translate properties for better readability
-        translated_companies = [
-            translator.translate_company_properties(company) 
-            for company in companies
-        ]
+        translated_companies = translator.translate_companies(companies)
         
         return CompanyResponse(
             companies=translated_companies,
@@ -135,10 +157,7 @@ async def list_companies(
             properties=property_list
         )
         
-        translated_companies = [
-            translator.translate_company_properties(company) 
-            for company in companies
-        ]
+        translated_companies = translator.translate_companies(companies)
         
         return CompanyResponse(
             companies=translated_companies,
@@ -237,6 +256,59 @@ async def discover_values(object_type: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _verify_hubspot_signature(request: Request, body: bytes) -> bool:
+    """Check a request's X-HubSpot-Signature-v3 against the app's client secret"""
+    signature = request.headers.get("X-HubSpot-Signature-v3")
+    timestamp = request.headers.get("X-HubSpot-Request-Timestamp")
+    if not signature or not timestamp:
+        return False
+    
+    # HubSpot rejects replays older than five minutes; so do we
+    try:
+        if abs(time.time() * 1000 - int(timestamp)) > _WEBHOOK_MAX_AGE_MS:
+            return False
+    except ValueError:
+        return False
+    
+    # HubSpot signs the URI with only these escapes decoded; anything else stays encoded
+    uri = _WEBHOOK_URI_DECODE_RE.sub(lambda match: _WEBHOOK_URI_DECODES[match.group(0).upper()], str(request.url))
+    source = f"{request.method}{uri}".encode() + body + timestamp.encode()
+    expected = base64.b64encode(
+        hmac.new(settings.HUBSPOT_CLIENT_SECRET.encode(), source, hashlib.sha256).digest()
+    ).decode()
+    return hmac.compare_digest(expected, signature)
+
+@app.post("/webhooks/hubspot")
+async def hubspot_webhook(request: Request):
+    """Invalidate cached value mappings when HubSpot reports owner or property definition changes"""
+    if not settings.HUBSPOT_CLIENT_SECRET:
+        raise HTTPException(status_code=503, detail="HubSpot webhooks are not configured")
+    
+    body = await request.body()
+    if not _verify_hubspot_signature(request, body):
+        raise HTTPException(status_code=401, detail="Invalid HubSpot signature")
+    
+    try:
+        events = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be JSON")
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        raise HTTPException(status_code=400, detail="Request body must be a list of webhook events")
+    
+    try:
+        # Value discovery caches are shared by every instance, so one service invalidates them all
+        invalidated = set()
+        for event in events:
+            invalidated.update(await value_discovery.on_webhook(event))
+        
+        return {
+            "received_events": len(events),
+            "invalidated": sorted(invalidated)
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/values/search/{object_type}")
 async def search_values(object_type: str, keyword: str):
     """Search for property values that match a keyword"""
@@ -400,11 +472,7 @@ async def encyclopedia_search(query: CompanyQuery, object_type: str = "companies
         
         # Translate properties for better readability if it's companies
         if object_type == "companies" and results.get("results"):
-            translated_results = [
-                translator.translate_company_properties(company) 
-                for company in results["results"]
-            ]
-            results["results"] = translated_results
+            results["results"] = translator.translate_companies(results["results"])
         
         return results
     
@@ -3,6 +3,7 @@ Encyclopedia Service for comprehensive HubSpot data mapping export
 """
 
 import json
+import orjson
 import os
 import time
 from datetime import datetime
@@ -243,15 +244,15 @@ class EncyclopediaService:
         if object_type:
             file_path = os.path.join(self.encyclopedia_dir, f"{object_type}.json")
             if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    return json.load(f)
+                with open(file_path, 'rb') as f:
+                    return orjson.loads(f.read())
             else:
                 return {}
         else:
             full_path = os.path.join(self.encyclopedia_dir, "full_encyclopedia.json")
             if os.path.exists(full_path):
-                with open(full_path, 'r') as f:
-                    return json.load(f)
+                with open(full_path, 'rb') as f:
+                    return orjson.loads(f.read())
             else:
                 return {}
     
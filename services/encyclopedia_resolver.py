@@ -8,11 +8,54 @@ from .encyclopedia import EncyclopediaService
 from .hubspot_client import HubSpotClient
 
 
+# Phrases that signal the query is about ownership ("in my name" is covered by "my name")
+_OWNER_INDICATOR_RE = re.compile(r"owner|owned by|'s|portfolio|my name|tyler beagley")
+
+# Every renewal phrase ("texting renewal", "upcoming renewal", ...) contains "renew"
+_RENEWAL_TERM_RE = re.compile(r"renew")
+_RENEWAL_PROPERTY_RE = re.compile(r"renew|next_|due|expire")
+
+_WORD_RE = re.compile(r"\w+")
+
+# Common city/state searches: query term -> (property, value)
+_LOCATIONS = {
+    "dallas": ("city", "Dallas"),
+    "texas": ("state", "TX"),
+    "houston": ("city", "Houston"),
+    "austin": ("city", "Austin"),
+    "san antonio": ("city", "San Antonio"),
+    "new york": ("city", "New York"),
+    "chicago": ("city", "Chicago"),
+    "los angeles": ("city", "Los Angeles"),
+    "miami": ("city", "Miami"),
+    "atlanta": ("city", "Atlanta"),
+    "denver": ("city", "Denver"),
+    "seattle": ("city", "Seattle"),
+    "portland": ("city", "Portland"),
+    "phoenix": ("city", "Phoenix"),
+    "salt lake city": ("city", "Salt Lake City"),
+    "provo": ("city", "Provo"),
+    "utah": ("state", "UT")
+}
+_LOCATION_MAX_WORDS = max(len(term.split()) for term in _LOCATIONS)
+
+
+def _query_ngrams(query: str, max_words: int) -> set:
+    """All runs of 1..max_words consecutive words in the query, joined by single spaces"""
+    words = _WORD_RE.findall(query)
+    return {
+        " ".join(words[i:i + n])
+        for n in range(1, max_words + 1)
+        for i in range(len(words) - n + 1)
+    }
+
+
 class EncyclopediaResolver:
     def __init__(self):
         self.encyclopedia = EncyclopediaService()
         self.hubspot_client = HubSpotClient()
         self._encyclopedia_cache = {}
+        self._resolver_plans = {}
         self._load_encyclopedia_cache()
     
     def _load_encyclopedia_cache(self):
@@ -21,9 +64,43 @@ class EncyclopediaResolver:
             data = self.encyclopedia.load_encyclopedia(object_type)
             if data:
                 self._encyclopedia_cache[object_type] = data
+                self._resolver_plans[object_type] = self._build_resolver_plan(data.get('value_mappings', {}))
                 value_count = len(data.get('value_mappings', {}))
                 print(f"✅ Loaded {object_type} encyclopedia: {value_count} properties with value mappings")
     
+    def _build_resolver_plan(self, value_mappings: Dict) -> List[Tuple[Any, bool]]:
+        """
+        Pick the resolvers that can produce filters for an object type, in priority order
+        
+        Resolvers whose backing properties are absent from the encyclopedia (e.g. account_status
+        on tickets) are dropped at load time so queries never pay for them.
+        
+        Returns:
+            List of (kind, resolver) tuples; kind is "owner", "status" or "mappings" and
+            determines which arguments the resolver takes
+        """
+        plan = []
+        
+        if "hubspot_owner_id" in value_mappings or "company_owner" in value_mappings:
+            plan.append(("owner", self._resolve_owner_queries))
+        if "account_status" in value_mappings:
+            plan.append(("status", self._resolve_status_queries))
+        if "industry" in value_mappings:
+            plan.append(("mappings", self._resolve_industry_queries))
+        if "customer_tier" in value_mappings:
+            plan.append(("mappings", self._resolve_tier_queries))
+        
+        # Location and date resolvers don't depend on specific value mappings
+        plan.append(("mappings", self._resolve_location_queries))
+        plan.append(("mappings", self._resolve_date_queries))
+        
+        if "churnguard_current_risk_level" in value_mappings or "churnguard_trending_risk_level" in value_mappings:
+            plan.append(("mappings", self._resolve_churnguard_risk_queries))
+        
+        plan.append(("mappings", self._resolve_generic_queries))
+        
+        return plan
+    
     def translate_query_to_mappings(self, object_type: str, user_query: str, user_email: str = None) -> Dict[str, Any]:
         """
         Pure translation layer: Convert natural language to HubSpot property mappings
@@ -36,11 +113,8 @@ class EncyclopediaResolver:
         Returns:
             Translation results with suggested search parameters (NO actual data)
         """
-        # Step 1: Analyze the query against encyclopedia
-        query_analysis = self._analyze_query_comprehensively(object_type, user_query)
-        
-        # Step 2: Resolve query to HubSpot filters using analysis
-        filters = self.resolve_query_to_filters(object_type, user_query, user_email)
+        # Step 1-2: Analyze the query and resolve it to HubSpot filters in one pass
+        query_analysis, filters = self._resolve_all(object_type, user_query, user_email)
         
         # Step 3: Generate human-readable explanation and next steps
         translation_explanation = self._generate_translation_explanation(query_analysis, filters, user_query)
@@ -72,11 +146,21 @@ class EncyclopediaResolver:
         Returns:
             Search results with comprehensive query analysis and resolved filters
         """
-        # Step 1: Analyze the query against encyclopedia
-        query_analysis = self._analyze_query_comprehensively(object_type, user_query)
-        
-        # Step 2: Resolve query to HubSpot filters using analysis
-        filters = self.resolve_query_to_filters(object_type, user_query, user_email)
+        # Step 1-2: Analyze the query and resolve it to HubSpot filters in one pass
+        query_analysis, filters = self._resolve_all(object_type, user_query, user_email)
+        
+        # Nothing recognized - skip the unfiltered HubSpot search entirely
+        if not filters and not any(query_analysis.values()):
+            return {
+                "query": user_query,
+                "object_type": object_type,
+                "query_analysis": query_analysis,
+                "resolved_filters": filters,
+                "results": [],
+                "total_returned": 0,
+                "limit_applied": limit,
+                "note": f"No encyclopedia terms recognized in '{user_query}'. Skipped unfiltered search; try naming an owner, status, location, or other known property value."
+            }
         
         # Step 3: Execute search
         results = await self._execute_search(object_type, filters, limit)
@@ -95,8 +179,16 @@ class EncyclopediaResolver:
             "note": data_insights
         }
     
-    def _analyze_query_comprehensively(self, object_type: str, user_query: str) -> Dict[str, Any]:
-        """Analyze the user's query against encyclopedia to understand intent"""
+    def _resolve_all(self, object_type: str, user_query: str, user_email: str = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Analyze the user's query and resolve it to HubSpot filters in a single sweep
+        
+        Owner and status mappings are walked once; the matches feed both the analysis
+        and the owner/status resolvers.
+        
+        Returns:
+            Tuple of (query analysis, list of HubSpot API filters)
+        """
         query_lower = user_query.lower()
         encyclopedia_data = self._encyclopedia_cache.get(object_type, {})
         
@@ -109,19 +201,22 @@ class EncyclopediaResolver:
             "industry_terms": [],
             "tier_terms": []
         }
+        filters = []
         
         if not encyclopedia_data:
-            return analysis
+            return analysis, filters
         
         value_mappings = encyclopedia_data.get('value_mappings', {})
         
         # Detect owner terms
+        owner_scans = {}
         for owner_prop in ["hubspot_owner_id", "company_owner"]:
             if owner_prop in value_mappings:
-                for owner_label in value_mappings[owner_prop].keys():
-                    if owner_label.lower() in query_lower or f"{owner_label.lower()}'s" in query_lower:
-                        analysis["owner_terms"].append(owner_label)
-                        analysis["detected_terms"].append(f"Owner: {owner_label}")
+                scan = self._scan_owner_mappings(query_lower, value_mappings[owner_prop], user_email)
+                owner_scans[owner_prop] = scan
+                for owner_label in scan["named_labels"]:
+                    analysis["owner_terms"].append(owner_label)
+                    analysis["detected_terms"].append(f"Owner: {owner_label}")
         
         # Detect status terms
         if "account_status" in value_mappings:
@@ -144,7 +239,17 @@ class EncyclopediaResolver:
                 analysis["location_terms"].append(term)
                 analysis["detected_terms"].append(f"Location: {term}")
         
-        return analysis
+        # Run only the resolvers that apply to this object type (owner, status, industry,
+        # tier, location, date, ChurnGuard risk, generic - in that order)
+        for kind, resolver in self._resolver_plans.get(object_type, []):
+            if kind == "owner":
+                filters.extend(resolver(query_lower, owner_scans))
+            elif kind == "status":
+                filters.extend(resolver(value_mappings, analysis["status_terms"]))
+            else:
+                filters.extend(resolver(query_lower, value_mappings))
+        
+        return analysis, filters
     
     def _generate_translation_explanation(self, query_analysis: Dict, filters: List[Dict], original_query: str) -> str:
         """Generate human-readable explanation of the translation"""
@@ -205,11 +310,10 @@ class EncyclopediaResolver:
                 insights.append(f"Found {total_results} companies for {owner} with renewal date criteria.")
                 
                 # Check if any actually have renewal dates
-                companies_with_dates = 0
-                for company in results:
-                    renewal_date = company.get('properties', {}).get('next_renewal_date')
-                    if renewal_date and renewal_date != 'N/A':
-                        companies_with_dates += 1
+                companies_with_dates = sum(
+                    1 for company in results
+                    if (renewal_date := company.get('properties', {}).get('next_renewal_date')) and renewal_date != 'N/A'
+                )
                 
                 if companies_with_dates == 0:
                     insights.append(f"However, none of these {total_results} companies have renewal dates populated in HubSpot.")
@@ -229,113 +333,77 @@ class EncyclopediaResolver:
         Returns:
             List of HubSpot API filters
         """
-        filters = []
-        query_lower = user_query.lower()
-        
-        # Get encyclopedia data for this object type
-        encyclopedia_data = self._encyclopedia_cache.get(object_type, {})
-        if not encyclopedia_data:
-            return filters
-        
-        value_mappings = encyclopedia_data.get('value_mappings', {})
-        
-        # Owner-based searches
-        owner_filters = self._resolve_owner_queries(query_lower, value_mappings, user_email)
-        filters.extend(owner_filters)
-        
-        # Status-based searches  
-        status_filters = self._resolve_status_queries(query_lower, value_mappings)
-        filters.extend(status_filters)
-        
-        # Industry-based searches
-        industry_filters = self._resolve_industry_queries(query_lower, value_mappings)
-        filters.extend(industry_filters)
-        
-        # Tier/size-based searches
-        tier_filters = self._resolve_tier_queries(query_lower, value_mappings)
-        filters.extend(tier_filters)
-        
-        # Location-based searches
-        location_filters = self._resolve_location_queries(query_lower, value_mappings)
-        filters.extend(location_filters)
-        
-        # Date-based searches (renewal dates, etc.)
-        date_filters = self._resolve_date_queries(query_lower, value_mappings)
-        filters.extend(date_filters)
-        
-        # ChurnGuard risk-based searches
-        risk_filters = self._resolve_churnguard_risk_queries(query_lower, value_mappings)
-        filters.extend(risk_filters)
-        
-        # Generic property value searches
-        generic_filters = self._resolve_generic_queries(query_lower, value_mappings)
-        filters.extend(generic_filters)
-        
+        _, filters = self._resolve_all(object_type, user_query, user_email)
         return filters
     
-    def _resolve_owner_queries(self, query: str, value_mappings: Dict, user_email: str = None) -> List[Dict[str, Any]]:
-        """Resolve owner-based queries using encyclopedia"""
-        filters = []
+    def _scan_owner_mappings(self, query: str, owner_mappings: Dict, user_email: str = None) -> Dict[str, List]:
+        """
+        Walk one owner mapping and collect every kind of match against the query
         
-        # Check both hubspot_owner_id and company_owner mappings
-        for owner_prop in ["hubspot_owner_id", "company_owner"]:
-            if owner_prop not in value_mappings:
-                continue
-                
-            owner_mappings = value_mappings[owner_prop]
-            
-            # Only look for owner names if query explicitly mentions ownership or person names
-            # Skip owner matching for generic location/status queries
-            owner_indicators = ["owner", "owned by", "'s", "portfolio", "my name", "in my name", "tyler beagley"]
-            has_owner_context = any(indicator in query for indicator in owner_indicators)
-            
-            if not has_owner_context:
-                continue  # Skip owner matching entirely
-            
-            # Look for owner names in query - prioritize exact matches
-            exact_matches = []
-            partial_matches = []
+        Returns:
+            Dictionary with "named_labels" (owner names found in the query), "exact" (owner IDs
+            matched by name or by the user's email for "my name" queries, in mapping order) and
+            "partial" ((owner_id, owner_lower) tuples for possessive first-name matches)
+        """
+        named_labels = []
+        exact = []
+        partial = []
+        
+        # Special case: "my name" should match the user's email to owner mapping
+        email_parts = None
+        if "my name" in query and user_email and '@' in user_email:
+            email_name = user_email.split('@')[0].lower()
+            # Try to match email prefix to owner name (e.g., tyler.beagley -> Tyler Beagley)
+            email_parts = email_name.replace('.', ' ').replace('_', ' ')
+        
+        for owner_label, owner_id in owner_mappings.items():
+            owner_lower = owner_label.lower()
+            name_in_query = owner_lower in query  # also covers the possessive form
+            if name_in_query:
+                named_labels.append(owner_label)
             
-            for owner_label, owner_id in owner_mappings.items():
-                owner_lower = owner_label.lower()
-                
-                # Special case: "my name" should match the user's email to owner mapping
-                if ("my name" in query or "in my name" in query) and user_email:
-                    # Try to match user email to owner name
-                    if user_email and '@' in user_email:
-                        email_name = user_email.split('@')[0].lower()
-                        # Try to match email prefix to owner name (e.g., tyler.beagley -> Tyler Beagley)
-                        email_parts = email_name.replace('.', ' ').replace('_', ' ')
-                        if email_parts in owner_lower or any(part in owner_lower for part in email_parts.split()):
-                            exact_matches.append((owner_prop, owner_id))
-                            continue
-                
-                # Check for exact full name matches first (including possessive)
-                if owner_lower in query or f"{owner_lower}'s" in query:
-                    exact_matches.append((owner_prop, owner_id))
+            if email_parts is not None:
+                if email_parts in owner_lower or any(part in owner_lower for part in email_parts.split()):
+                    exact.append(owner_id)
                     continue
-                
-                # Check for first name matches only if query has clear owner context
-                if " " in owner_label and "'s" in query:  # Only if possessive is used
-                    first_name = owner_label.split()[0].lower()
-                    if f"{first_name}'s" in query:
-                        partial_matches.append((owner_prop, owner_id, owner_lower))
             
+            # Check for exact full name matches first (including possessive)
+            if name_in_query:
+                exact.append(owner_id)
+                continue
+            
+            # Check for first name matches only if query has clear owner context
+            if " " in owner_label and "'s" in query:  # Only if possessive is used
+                first_name = owner_label.split()[0].lower()
+                if f"{first_name}'s" in query:
+                    partial.append((owner_id, owner_lower))
+        
+        return {"named_labels": named_labels, "exact": exact, "partial": partial}
+    
+    def _resolve_owner_queries(self, query: str, owner_scans: Dict[str, Dict[str, List]]) -> List[Dict[str, Any]]:
+        """Resolve owner-based queries from the owner mapping scans"""
+        filters = []
+        
+        # Only look for owner names if query explicitly mentions ownership or person names
+        # Skip owner matching for generic location/status queries
+        if not _OWNER_INDICATOR_RE.search(query):
+            return filters
+        
+        # Check both hubspot_owner_id and company_owner mappings
+        for owner_prop, scan in owner_scans.items():
             # Prefer exact matches, then longest partial match
-            if exact_matches:
-                prop, owner_id = exact_matches[0]
+            if scan["exact"]:
                 filters.append({
-                    "propertyName": prop,
+                    "propertyName": owner_prop,
                     "operator": "EQ", 
-                    "value": owner_id
+                    "value": scan["exact"][0]
                 })
                 return filters
-            elif partial_matches:
+            elif scan["partial"]:
                 # Find the longest matching name to avoid "Tyler" matching both "Tyler Price" and "Tyler Beagley"
-                longest_match = max(partial_matches, key=lambda x: len(x[2]))
-                prop, owner_id, _ = longest_match
+                owner_id, _ = max(scan["partial"], key=lambda x: len(x[1]))
                 filters.append({
-                    "propertyName": prop,
+                    "propertyName": owner_prop,
                     "operator": "EQ", 
                     "value": owner_id
                 })
@@ -343,22 +411,17 @@ class EncyclopediaResolver:
         
         return filters
     
-    def _resolve_status_queries(self, query: str, value_mappings: Dict) -> List[Dict[str, Any]]:
-        """Resolve status-based queries using encyclopedia"""
+    def _resolve_status_queries(self, value_mappings: Dict, status_terms: List[str]) -> List[Dict[str, Any]]:
+        """Resolve status-based queries from the status labels detected in the query"""
         filters = []
         
-        # Check account_status mappings
-        if "account_status" in value_mappings:
-            status_mappings = value_mappings["account_status"]
-            
-            for status_label, internal_value in status_mappings.items():
-                if status_label.lower() in query:
-                    filters.append({
-                        "propertyName": "account_status",
-                        "operator": "EQ",
-                        "value": internal_value
-                    })
-                    break  # Take first match
+        # Take first match
+        if status_terms:
+            filters.append({
+                "propertyName": "account_status",
+                "operator": "EQ",
+                "value": value_mappings["account_status"][status_terms[0]]
+            })
         
         return filters
     
@@ -424,46 +487,23 @@ class EncyclopediaResolver:
         """Resolve location-based queries using encyclopedia"""
         filters = []
         
-        # Common city searches
-        cities = {
-            "dallas": "Dallas",
-            "texas": "TX",  # State searches
-            "houston": "Houston", 
-            "austin": "Austin",
-            "san antonio": "San Antonio",
-            "new york": "New York",
-            "chicago": "Chicago",
-            "los angeles": "Los Angeles",
-            "miami": "Miami",
-            "atlanta": "Atlanta",
-            "denver": "Denver",
-            "seattle": "Seattle",
-            "portland": "Portland",
-            "phoenix": "Phoenix",
-            "salt lake city": "Salt Lake City",
-            "provo": "Provo",
-            "utah": "UT"
-        }
-        
         # Check for city matches - prioritize specific cities over states
         city_filters = []
         state_filters = []
         
-        for city_term, city_value in cities.items():
-            if city_term in query:
-                # Determine if it's a state or city
-                if len(city_value) == 2:  # State abbreviation
-                    state_filters.append({
-                        "propertyName": "state",
-                        "operator": "EQ",
-                        "value": city_value
-                    })
-                else:  # City name
-                    city_filters.append({
-                        "propertyName": "city", 
-                        "operator": "EQ",
-                        "value": city_value
-                    })
+        query_ngrams = _query_ngrams(query, _LOCATION_MAX_WORDS)
+        
+        for location_term, (property_name, location_value) in _LOCATIONS.items():
+            if location_term in query_ngrams:
+                location_filter = {
+                    "propertyName": property_name,
+                    "operator": "EQ",
+                    "value": location_value
+                }
+                if property_name == "city":
+                    city_filters.append(location_filter)
+                else:
+                    state_filters.append(location_filter)
         
         # Prioritize city filters over state filters
         if city_filters:
@@ -570,14 +610,11 @@ class EncyclopediaResolver:
         filters = []
         
         # Handle renewal date queries
-        renewal_terms = ["renewal", "renew", "texting renewal", "text renewal", "upcoming renewal"]
-        has_renewal_term = any(term in query for term in renewal_terms)
-        
-        if has_renewal_term:
+        if _RENEWAL_TERM_RE.search(query):
             # Look for next_renewal_date or similar properties
             date_properties = []
             for prop_name in value_mappings.keys():
-                if any(term in prop_name.lower() for term in ["renewal", "renew", "next_", "due", "expire"]):
+                if _RENEWAL_PROPERTY_RE.search(prop_name.lower()):
                     date_properties.append(prop_name)
             
             # If we found renewal-related properties, filter for non-empty values
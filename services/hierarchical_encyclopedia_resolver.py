@@ -3,33 +3,92 @@ Hierarchical Encyclopedia Resolver for efficient, group-based property searching
 Uses HubSpot property groups to dramatically reduce search scope and token usage
 """
 
+import asyncio
+import functools
+import heapq
+import json
 import re
+import time
+from collections import Counter
 from typing import Dict, List, Any, Optional, Tuple
 from .encyclopedia import EncyclopediaService
 from .hubspot_client import HubSpotClient
 
 
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Filler words that would otherwise match almost every group's keywords
+_STOPWORDS = frozenset({
+    "", "a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "the", "to", "with"
+})
+
+# Renewal phrases ("renewal", "renew", "texting renewal") all contain "renew"; "upcoming" implies a renewal date
+_RENEWAL_TERM_RE = re.compile(r"renew|upcoming")
+# Alphanumeric runs of an owner label, used to index owners by name/email token
+_OWNER_TOKEN_RE = re.compile(r"[^\W_]+")
+# Separators in the local part of an email ("tyler.beagley", "tyler_beagley") become spaces
+_EMAIL_TRANS = str.maketrans({'.': ' ', '_': ' '})
+
+_OBJECT_TYPES = ["companies", "contacts", "deals", "tickets"]
+
+# Search results are reused for identical (object_type, filters, limit) requests
+# within this window, so dashboard refreshes and repeated chat turns skip HubSpot
+_SEARCH_CACHE_TTL_SECONDS = 60
+_SEARCH_CACHE_MAX_ENTRIES = 256
+
+
 class HierarchicalEncyclopediaResolver:
     def __init__(self):
         self.encyclopedia = EncyclopediaService()
         self.hubspot_client = HubSpotClient()
         self._hierarchical_cache = {}
-        self._group_keywords = {}
-        self._load_hierarchical_cache()
+        self._keyword_to_groups = {}
+        # object_type -> {substring of a group display name word: [group names]}, for the exact-match boost
+        self._display_name_index = {}
+        # object_type -> {group_name: position}, so scored groups keep their encyclopedia order
+        self._group_positions = {}
+        # object_type -> {substring of a label word: [(group_name, property position, prop_name)]}
+        self._label_term_index = {}
+        self._search_cache = {}
+        # Group relevance depends only on the set of query words, so memoize it per instance
+        self._relevant_groups_for_words = functools.lru_cache(maxsize=1024)(self._score_relevant_groups)
+        # Encyclopedia data is loaded lazily, once per object type, off the event loop
+        self._load_tasks = {}
+    
+    async def load_hierarchical_cache(self):
+        """Load every object type's hierarchical encyclopedia concurrently (e.g. at app startup)"""
+        await asyncio.gather(*(self._ensure_loaded(object_type) for object_type in _OBJECT_TYPES))
+    
+    async def _ensure_loaded(self, object_type: str):
+        """Load an object type's encyclopedia on first use; concurrent callers share one load"""
+        task = self._load_tasks.get(object_type)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._load_object_type, object_type))
+            self._load_tasks[object_type] = task
+        try:
+            await task
+        except Exception as e:
+            # Allow a later request to retry a failed load
+            self._load_tasks.pop(object_type, None)
+            print(f"Error loading hierarchical {object_type}: {e}")
     
-    def _load_hierarchical_cache(self):
-        """Load hierarchical encyclopedia data and build keyword indexes"""
-        for object_type in ["companies", "contacts", "deals", "tickets"]:
-            data = self.encyclopedia.load_encyclopedia(object_type)
-            if data and data.get("groups"):
-                self._hierarchical_cache[object_type] = data
-                self._build_group_keywords(object_type, data["groups"])
-                print(f"✅ Loaded hierarchical {object_type}: {len(data['groups'])} groups")
+    def _load_object_type(self, object_type: str):
+        """Load hierarchical encyclopedia data for one object type and build its keyword indexes"""
+        data = self.encyclopedia.load_encyclopedia(object_type)
+        if data and data.get("groups"):
+            self._build_group_keywords(object_type, data["groups"])
+            self._hierarchical_cache[object_type] = data
+            # Drop relevance scored while this object type had no data (e.g. before a failed load was retried)
+            self._relevant_groups_for_words.cache_clear()
+            print(f"✅ Loaded hierarchical {object_type}: {len(data['groups'])} groups")
     
     def _build_group_keywords(self, object_type: str, groups: Dict[str, Any]):
-        """Build keyword mapping for efficient group identification"""
-        if object_type not in self._group_keywords:
-            self._group_keywords[object_type] = {}
+        """Build the keyword -> group names inverted index and the substring indexes used to score groups and match labels"""
+        keyword_to_groups = self._keyword_to_groups[object_type] = {}
+        display_name_index = self._display_name_index[object_type] = {}
+        label_term_index = self._label_term_index[object_type] = {}
+        self._group_positions[object_type] = {group_name: position for position, group_name in enumerate(groups)}
         
         for group_name, group_data in groups.items():
             keywords = set()
@@ -37,18 +96,82 @@ class HierarchicalEncyclopediaResolver:
             # Add group display name keywords
             display_name = group_data.get("display_name", "").lower()
             keywords.update(display_name.split())
+            group_data["_display_name_lower"] = display_name
+            self._index_substrings(display_name_index, display_name, group_name)
             
             # Add keywords from property names and labels
-            for prop_name, prop_info in group_data.get("properties", {}).items():
+            for position, (prop_name, prop_info) in enumerate(group_data.get("properties", {}).items()):
                 # Add property internal name keywords
                 keywords.update(prop_name.lower().split("_"))
                 
                 # Add property label keywords
                 label = prop_info.get("label", "").lower()
                 keywords.update(label.split())
+                
+                self._annotate_property(prop_info, label)
+                self._index_substrings(label_term_index, label, (group_name, position, prop_name))
+            
+            # Drop empty fragments (e.g. from "hs__name") and stopwords
+            keywords = frozenset(keywords - _STOPWORDS)
             
-            # Store keywords for this group
-            self._group_keywords[object_type][group_name] = keywords
+            for keyword in keywords:
+                keyword_to_groups.setdefault(keyword, set()).add(group_name)
+    
+    @staticmethod
+    def _index_substrings(index: Dict[str, List[Any]], text_lower: str, entry: Any):
+        """
+        Index an entry under every substring of a text's words
+        
+        A whitespace-free query term occurs in a label or display name exactly when it's
+        a substring of one of its words, so one dict lookup per term finds every entry
+        whose text contains it.
+        """
+        substrings = set()
+        for word in text_lower.split():
+            for start in range(len(word)):
+                for end in range(start + 1, len(word) + 1):
+                    substrings.add(word[start:end])
+        
+        for substring in substrings:
+            index.setdefault(substring, []).append(entry)
+    
+    def _annotate_property(self, prop_info: Dict[str, Any], label_lower: str):
+        """
+        Precompute per-property lookup data so queries don't redo string work
+        
+        Adds "_label_lower", "_categories" (subset of owner/status/date/renewal derived
+        from the label) and "_value_mappings_lower" (lowercased label -> internal value,
+        first label wins on collisions, plus the same pairs pre-materialized as
+        "_value_mappings_lower_items"). Owner properties also get "_owner_token_index"
+        (name token -> owner ids) for matching a user's email against owner names.
+        """
+        categories = set()
+        if "owner" in label_lower:
+            categories.add("owner")
+        if "status" in label_lower or "stage" in label_lower:
+            categories.add("status")
+        if "date" in label_lower or "renewal" in label_lower:
+            categories.add("date")
+        if "renew" in label_lower:
+            categories.add("renewal")
+        
+        value_mappings_lower = {}
+        for label, internal_value in (prop_info.get("value_mappings") or {}).items():
+            value_mappings_lower.setdefault(label.lower(), internal_value)
+        
+        prop_info["_label_lower"] = label_lower
+        prop_info["_categories"] = frozenset(categories)
+        prop_info["_value_mappings_lower"] = value_mappings_lower
+        prop_info["_value_mappings_lower_items"] = list(value_mappings_lower.items())
+        
+        if "owner" in categories:
+            owner_token_index = {}
+            for owner_lower, owner_id in value_mappings_lower.items():
+                for token in _OWNER_TOKEN_RE.findall(owner_lower):
+                    owner_ids = owner_token_index.setdefault(token, [])
+                    if owner_id not in owner_ids:
+                        owner_ids.append(owner_id)
+            prop_info["_owner_token_index"] = owner_token_index
     
     async def resolve_and_search(self, object_type: str, user_query: str, limit: int = 200, user_email: str = None) -> Dict[str, Any]:
         """
@@ -63,6 +186,8 @@ class HierarchicalEncyclopediaResolver:
         Returns:
             Search results with hierarchical analysis and resolved filters
         """
+        await self._ensure_loaded(object_type)
+        
         # Step 1: Identify relevant property groups (massive scope reduction)
         relevant_groups = self._identify_relevant_groups(object_type, user_query)
         
@@ -78,6 +203,8 @@ class HierarchicalEncyclopediaResolver:
         # Step 5: Generate insights
         insights = self._generate_hierarchical_insights(query_analysis, filters, results, user_query, relevant_groups)
         
+        total_groups = len(self._hierarchical_cache.get(object_type, {}).get("groups", {}))
+        
         return {
             "query": user_query,
             "object_type": object_type,
@@ -89,9 +216,9 @@ class HierarchicalEncyclopediaResolver:
             "limit_applied": limit,
             "note": insights,
             "efficiency_stats": {
-                "total_groups_available": len(self._hierarchical_cache.get(object_type, {}).get("groups", {})),
+                "total_groups_available": total_groups,
                 "groups_searched": len(relevant_groups),
-                "efficiency_improvement": f"{((1 - len(relevant_groups) / max(1, len(self._hierarchical_cache.get(object_type, {}).get('groups', {})))) * 100):.1f}% reduction in search scope"
+                "efficiency_improvement": f"{((1 - len(relevant_groups) / max(1, total_groups)) * 100):.1f}% reduction in search scope"
             }
         }
     
@@ -100,60 +227,61 @@ class HierarchicalEncyclopediaResolver:
         Identify which property groups are relevant to the user's query
         This dramatically reduces the search scope
         """
-        query_lower = user_query.lower()
-        query_words = set(re.findall(r'\b\w+\b', query_lower))
-        
+        query_words = frozenset(_WORD_RE.findall(user_query.lower()))
+        return list(self._relevant_groups_for_words(object_type, query_words))
+    
+    def _score_relevant_groups(self, object_type: str, query_words: frozenset) -> Tuple[Dict[str, Any], ...]:
+        """Score the groups of object_type that match the query words and return the top matches"""
         hierarchical_data = self._hierarchical_cache.get(object_type, {})
         groups = hierarchical_data.get("groups", {})
         
-        relevant_groups = []
-        group_scores = []
-        
-        for group_name, group_data in groups.items():
-            # Get keywords for this group
-            group_keywords = self._group_keywords.get(object_type, {}).get(group_name, set())
-            
-            # Calculate relevance score
-            common_words = query_words.intersection(group_keywords)
-            relevance_score = len(common_words)
+        # Tally keyword hits and display-name boosts through the indexes, so only groups
+        # touched by a query word are visited
+        keyword_index = self._keyword_to_groups.get(object_type, {})
+        display_name_index = self._display_name_index.get(object_type, {})
+        matched_words = {}
+        scores = Counter()
+        for query_word in query_words:
+            for group_name in keyword_index.get(query_word, ()):
+                matched_words.setdefault(group_name, []).append(query_word)
+                scores[group_name] += 1
             
             # Boost score for exact matches
-            display_name_lower = group_data.get("display_name", "").lower()
-            for query_word in query_words:
-                if query_word in display_name_lower:
-                    relevance_score += 2
-            
-            # Add group if relevant
-            if relevance_score > 0:
-                group_info = {
-                    "name": group_name,
-                    "display_name": group_data.get("display_name", ""),
-                    "properties": group_data.get("properties", {}),
-                    "property_count": group_data.get("property_count", 0),
-                    "relevance_score": relevance_score,
-                    "matched_keywords": list(common_words)
-                }
-                relevant_groups.append(group_info)
-                group_scores.append(relevance_score)
+            for group_name in display_name_index.get(query_word, ()):
+                scores[group_name] += 2
         
-        # Sort by relevance score (highest first)
-        relevant_groups.sort(key=lambda x: x["relevance_score"], reverse=True)
+        relevant_groups = []
+        
+        group_positions = self._group_positions.get(object_type, {})
+        for group_name in sorted(scores, key=group_positions.__getitem__):
+            group_data = groups[group_name]
+            group_info = {
+                "name": group_name,
+                "display_name": group_data.get("display_name", ""),
+                "properties": group_data.get("properties", {}),
+                "property_count": group_data.get("property_count", 0),
+                "relevance_score": scores[group_name],
+                "matched_keywords": matched_words.get(group_name, [])
+            }
+            relevant_groups.append(group_info)
         
         # If no specific groups found, include most common groups as fallback
         if not relevant_groups:
             common_groups = ["company_information", "companyinformation", "billing_information", "customer_success"]
             for group_name in common_groups:
-                if group_name in groups:
+                group_data = groups.get(group_name)
+                if group_data is not None:
                     relevant_groups.append({
                         "name": group_name,
-                        "display_name": groups[group_name].get("display_name", ""),
-                        "properties": groups[group_name].get("properties", {}),
-                        "property_count": groups[group_name].get("property_count", 0),
+                        "display_name": group_data.get("display_name", ""),
+                        "properties": group_data.get("properties", {}),
+                        "property_count": group_data.get("property_count", 0),
                         "relevance_score": 0,
                         "matched_keywords": []
                     })
         
-        return relevant_groups[:5]  # Limit to top 5 most relevant groups
+        # Limit to top 5 most relevant groups (highest score first, ties keep group order)
+        return tuple(heapq.nlargest(5, relevant_groups, key=lambda x: x["relevance_score"]))
     
     def _analyze_query_hierarchically(self, object_type: str, user_query: str, relevant_groups: List[Dict]) -> Dict[str, Any]:
         """Analyze query within the context of relevant groups only"""
@@ -169,24 +297,31 @@ class HierarchicalEncyclopediaResolver:
             "groups_analyzed": [group["display_name"] for group in relevant_groups]
         }
         
-        # Search only within relevant groups for efficiency
-        for group in relevant_groups:
-            properties = group.get("properties", {})
+        # Look each query term up in the label index instead of scanning every label
+        label_term_index = self._label_term_index.get(object_type, {})
+        group_ranks = {group["name"]: rank for rank, group in enumerate(relevant_groups)}
+        matches = set()
+        for term in set(query_lower.split()):
+            for group_name, position, prop_name in label_term_index.get(term, ()):
+                rank = group_ranks.get(group_name)
+                if rank is not None:
+                    matches.add((rank, position, prop_name))
+        
+        # Search only within relevant groups for efficiency, in group then property order
+        for rank, _, prop_name in sorted(matches):
+            group = relevant_groups[rank]
+            prop_info = group["properties"][prop_name]
             
-            for prop_name, prop_info in properties.items():
-                prop_label_lower = prop_info.get("label", "").lower()
-                
-                # Check if query terms match this property
-                if any(term in prop_label_lower for term in query_lower.split()):
-                    # Categorize the property
-                    if "owner" in prop_label_lower:
-                        analysis["owner_terms"].append(prop_info.get("label", ""))
-                    elif "status" in prop_label_lower or "stage" in prop_label_lower:
-                        analysis["status_terms"].append(prop_info.get("label", ""))
-                    elif "date" in prop_label_lower or "renewal" in prop_label_lower:
-                        analysis["date_terms"].append(prop_info.get("label", ""))
-                    
-                    analysis["detected_terms"].append(f"{group['display_name']}: {prop_info.get('label', '')}")
+            # Categorize the property
+            categories = prop_info["_categories"]
+            if "owner" in categories:
+                analysis["owner_terms"].append(prop_info.get("label", ""))
+            elif "status" in categories:
+                analysis["status_terms"].append(prop_info.get("label", ""))
+            elif "date" in categories:
+                analysis["date_terms"].append(prop_info.get("label", ""))
+            
+            analysis["detected_terms"].append(f"{group['display_name']}: {prop_info.get('label', '')}")
         
         return analysis
     
@@ -195,24 +330,25 @@ class HierarchicalEncyclopediaResolver:
         filters = []
         query_lower = user_query.lower()
         
-        # Search within relevant groups only (massive efficiency gain)
+        resolvers = {
+            "owner": lambda properties: self._resolve_owner_in_group(query_lower, properties, user_email),
+            "status": lambda properties: self._resolve_status_in_group(query_lower, properties),
+            "date": lambda properties: self._resolve_date_in_group(query_lower, properties)
+        }
+        
+        # Search within relevant groups only (massive efficiency gain). Each category
+        # contributes filters from the first group that resolves it, so compound queries
+        # ("Smith's active renewals") become a single ANDed HubSpot search
         for group in relevant_groups:
-            properties = group.get("properties", {})
-            
-            # Owner resolution
-            owner_filters = self._resolve_owner_in_group(query_lower, properties, user_email)
-            filters.extend(owner_filters)
+            properties = group["properties"]
             
-            # Status resolution  
-            status_filters = self._resolve_status_in_group(query_lower, properties)
-            filters.extend(status_filters)
+            for category, resolve in list(resolvers.items()):
+                category_filters = resolve(properties)
+                if category_filters:
+                    filters.extend(category_filters)
+                    del resolvers[category]
             
-            # Date resolution
-            date_filters = self._resolve_date_in_group(query_lower, properties)
-            filters.extend(date_filters)
-            
-            # Break after finding filters to avoid conflicts
-            if filters:
+            if not resolvers:
                 break
         
         return filters
@@ -221,33 +357,30 @@ class HierarchicalEncyclopediaResolver:
         """Resolve owner queries within a specific property group"""
         filters = []
         
+        # Normalize the user's email once for "my name" queries
+        email_parts = None
+        if "my name" in query and user_email and '@' in user_email:
+            email_name = user_email.split('@')[0].lower()
+            email_parts = email_name.translate(_EMAIL_TRANS)
+        
         # Look for owner-like properties in this group
         for prop_name, prop_info in properties.items():
-            prop_label_lower = prop_info.get("label", "").lower()
-            
-            if "owner" in prop_label_lower and prop_info.get("value_mappings"):
-                owner_mappings = prop_info["value_mappings"]
-                
+            if "owner" in prop_info["_categories"] and prop_info["_value_mappings_lower"]:
                 # Handle "my name" with email matching
-                if ("my name" in query or "in my name" in query) and user_email:
-                    if user_email and '@' in user_email:
-                        email_name = user_email.split('@')[0].lower()
-                        email_parts = email_name.replace('.', ' ').replace('_', ' ')
-                        
-                        for owner_label, owner_id in owner_mappings.items():
-                            owner_lower = owner_label.lower()
-                            if email_parts in owner_lower or any(part in owner_lower for part in email_parts.split()):
-                                filters.append({
-                                    "propertyName": prop_name,
-                                    "operator": "EQ",
-                                    "value": owner_id
-                                })
-                                return filters
+                if email_parts is not None:
+                    owner_id = self._match_owner_by_email(email_parts, prop_info)
+                    
+                    if owner_id is not None:
+                        filters.append({
+                            "propertyName": prop_name,
+                            "operator": "EQ",
+                            "value": owner_id
+                        })
+                        return filters
                 
-                # Handle explicit owner names
-                for owner_label, owner_id in owner_mappings.items():
-                    owner_lower = owner_label.lower()
-                    if owner_lower in query or f"{owner_lower}'s" in query:
+                # Handle explicit owner names (this also covers the possessive "<owner>'s")
+                for owner_lower, owner_id in prop_info["_value_mappings_lower_items"]:
+                    if owner_lower in query:
                         filters.append({
                             "propertyName": prop_name,
                             "operator": "EQ",
@@ -257,18 +390,34 @@ class HierarchicalEncyclopediaResolver:
         
         return filters
     
+    def _match_owner_by_email(self, email_parts: str, prop_info: Dict[str, Any]) -> Optional[str]:
+        """
+        Find the owner whose name best matches the parts of a user's email
+        
+        Looks each email part up in the owner token index and picks the owner matching
+        the most parts; falls back to a substring scan of owner labels when no part is
+        a whole name token (e.g. abbreviated emails like "tbeagley").
+        """
+        token_hits = {}
+        for part in email_parts.split():
+            for owner_id in prop_info["_owner_token_index"].get(part, ()):
+                token_hits[owner_id] = token_hits.get(owner_id, 0) + 1
+        if token_hits:
+            return max(token_hits, key=token_hits.get)
+        
+        for owner_lower, owner_id in prop_info["_value_mappings_lower"].items():
+            if email_parts in owner_lower or any(part in owner_lower for part in email_parts.split()):
+                return owner_id
+        return None
+    
     def _resolve_status_in_group(self, query: str, properties: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Resolve status queries within a specific property group"""
         filters = []
         
         for prop_name, prop_info in properties.items():
-            prop_label_lower = prop_info.get("label", "").lower()
-            
-            if ("status" in prop_label_lower or "stage" in prop_label_lower) and prop_info.get("value_mappings"):
-                status_mappings = prop_info["value_mappings"]
-                
-                for status_label, internal_value in status_mappings.items():
-                    if status_label.lower() in query:
+            if "status" in prop_info["_categories"] and prop_info["_value_mappings_lower"]:
+                for status_lower, internal_value in prop_info["_value_mappings_lower_items"]:
+                    if status_lower in query:
                         filters.append({
                             "propertyName": prop_name,
                             "operator": "EQ",
@@ -282,16 +431,11 @@ class HierarchicalEncyclopediaResolver:
         """Resolve date queries within a specific property group"""
         filters = []
         
-        renewal_terms = ["renewal", "renew", "texting renewal", "upcoming"]
-        has_renewal_term = any(term in query for term in renewal_terms)
-        
-        if has_renewal_term:
+        if _RENEWAL_TERM_RE.search(query):
             for prop_name, prop_info in properties.items():
-                prop_label_lower = prop_info.get("label", "").lower()
-                
-                if "renewal" in prop_label_lower or "renew" in prop_label_lower:
+                if "renewal" in prop_info["_categories"]:
                     # Prioritize texting renewal
-                    if "texting" in prop_label_lower:
+                    if "texting" in prop_info["_label_lower"]:
                         filters.insert(0, {
                             "propertyName": prop_name,
                             "operator": "HAS_PROPERTY",
@@ -311,7 +455,12 @@ class HierarchicalEncyclopediaResolver:
         return filters
     
     async def _execute_search(self, object_type: str, filters: List[Dict], limit: int) -> List[Dict[str, Any]]:
-        """Execute search using HubSpot API"""
+        """Execute search using HubSpot API, reusing recent results for identical searches"""
+        cache_key = (object_type, json.dumps(filters, sort_keys=True), limit)
+        cached = self._search_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < _SEARCH_CACHE_TTL_SECONDS:
+            return cached[1]
+        
         try:
             if object_type == "companies":
                 # Ensure we request essential display properties
@@ -333,12 +482,25 @@ class HierarchicalEncyclopediaResolver:
                 )
                 results = response.get("results", [])
             
+            self._store_search_results(cache_key, results)
             return results
             
         except Exception as e:
             print(f"Search error for {object_type}: {e}")
             return []
     
+    def _store_search_results(self, cache_key: Tuple, results: List[Dict[str, Any]]):
+        """Cache search results, evicting expired (then oldest) entries when the cache is full"""
+        now = time.monotonic()
+        if len(self._search_cache) >= _SEARCH_CACHE_MAX_ENTRIES:
+            self._search_cache = {
+                key: entry for key, entry in self._search_cache.items()
+                if now - entry[0] < _SEARCH_CACHE_TTL_SECONDS
+            }
+            if len(self._search_cache) >= _SEARCH_CACHE_MAX_ENTRIES:
+                del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[cache_key] = (now, results)
+    
     def _generate_hierarchical_insights(self, query_analysis: Dict, filters: List[Dict], results: List[Dict], original_query: str, relevant_groups: List[Dict]) -> str:
         """Generate insights about hierarchical search results"""
         insights = []
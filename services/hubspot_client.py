@@ -2,13 +2,31 @@
 HubSpot API client for interacting with HubSpot CRM
 """
 
+import asyncio
 import httpx
-import json
+import orjson
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from config.settings import settings
 
+# HubSpot CRM search returns at most 200 records per page and 10,000 per query
+DEALS_SEARCH_PAGE_SIZE = 200
+SEARCH_RESULTS_CAP = 10000
+# Concurrent page requests, sent at most one batch per second: the search endpoint is
+# limited to 5 requests per second per account
+SEARCH_PAGE_CONCURRENCY = 4
+# Retries for a search page answered with 429, waiting 1s, 2s, 4s... between attempts
+SEARCH_RATE_LIMIT_RETRIES = 3
+
+class RateLimitError(Exception):
+    """HubSpot answered 429 Too Many Requests"""
+
 class HubSpotClient:
+    # One connection pool shared by every HubSpotClient instance, so all services
+    # reuse keep-alive connections instead of paying a TCP+TLS handshake per request
+    _http_client: Optional[httpx.AsyncClient] = None
+    
     def __init__(self):
         self.access_token = settings.HUBSPOT_ACCESS_TOKEN
         self.base_url = settings.HUBSPOT_BASE_URL
@@ -17,27 +35,43 @@ class HubSpotClient:
             "Content-Type": "application/json"
         }
     
+    @classmethod
+    def _get_http_client(cls) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use"""
+        if cls._http_client is None or cls._http_client.is_closed:
+            cls._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+            )
+        return cls._http_client
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP client (call on application shutdown)"""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
+    
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make an HTTP request to HubSpot API"""
         url = f"{self.base_url}{endpoint}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=self.headers,
-                timeout=30.0,
-                **kwargs
-            )
-            
-            if response.status_code == 401:
-                raise Exception("Invalid HubSpot access token")
-            elif response.status_code == 429:
-                raise Exception("Rate limit exceeded")
-            elif response.status_code >= 400:
-                raise Exception(f"HubSpot API error: {response.status_code} - {response.text}")
-            
-            return response.json()
+        response = await self._get_http_client().request(
+            method=method,
+            url=url,
+            headers=self.headers,
+            **kwargs
+        )
+        
+        if response.status_code == 401:
+            raise Exception("Invalid HubSpot access token")
+        elif response.status_code == 429:
+            raise RateLimitError("Rate limit exceeded")
+        elif response.status_code >= 400:
+            raise Exception(f"HubSpot API error: {response.status_code} - {response.text}")
+        
+        # orjson parses large search/properties payloads several times faster than stdlib json
+        return orjson.loads(response.content)
     
     async def search_companies(
         self, 
@@ -108,6 +142,51 @@ class HubSpotClient:
         
         return response.get("results", [])
     
+    async def _search_all_pages(self, endpoint: str, search_request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run a CRM search and collect every page of results
+        
+        The first page reports the total match count; the remaining pages are then
+        requested concurrently (a few at a time, one batch per second, to stay under
+        HubSpot's search rate limit) using numeric "after" offsets.
+        """
+        page_size = search_request["limit"]
+        first_page = await self._search_page(endpoint, search_request)
+        results = first_page.get("results", [])
+        
+        if not first_page.get("paging", {}).get("next"):
+            return results
+        
+        total = min(first_page.get("total", 0), SEARCH_RESULTS_CAP)
+        offsets = list(range(page_size, total, page_size))
+        
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(offsets), SEARCH_PAGE_CONCURRENCY):
+            batch_started = loop.time()
+            pages = await asyncio.gather(*(
+                self._search_page(endpoint, {**search_request, "after": str(offset)})
+                for offset in offsets[i:i + SEARCH_PAGE_CONCURRENCY]
+            ))
+            for page in pages:
+                results.extend(page.get("results", []))
+            
+            # Pace batches so a large result set doesn't run into the per-second limit
+            if i + SEARCH_PAGE_CONCURRENCY < len(offsets):
+                await asyncio.sleep(max(0.0, 1.0 - (loop.time() - batch_started)))
+        
+        return results
+    
+    async def _search_page(self, endpoint: str, search_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Request one page of a CRM search, backing off and retrying when rate limited"""
+        for attempt in range(SEARCH_RATE_LIMIT_RETRIES):
+            try:
+                return await self._make_request("POST", endpoint, json=search_request)
+            except RateLimitError:
+                await asyncio.sleep(2 ** attempt)
+        
+        # Last attempt; a rate limit now propagates to the caller
+        return await self._make_request("POST", endpoint, json=search_request)
+    
     async def get_contracts_closed_metrics(
         self,
         start_date: Optional[str] = None,
@@ -149,48 +228,33 @@ class HubSpotClient:
                 }
             ],
             "properties": settings.CONTRACTS_PROPERTIES,
-            "limit": 200
+            "limit": DEALS_SEARCH_PAGE_SIZE
         }
         
-        response = await self._make_request(
-            "POST",
-            "/crm/v3/objects/deals/search",
-            json=search_request
-        )
+        deals = await self._search_all_pages("/crm/v3/objects/deals/search", search_request)
         
-        deals = response.get("results", [])
-        
-        # Calculate metrics
+        # Calculate totals and group by month in a single pass
         total_deals = len(deals)
-        total_value = sum(
-            float(deal.get("properties", {}).get("amount", 0) or 0) 
-            for deal in deals
-        )
+        total_value = 0
+        monthly_metrics = defaultdict(lambda: {"count": 0, "total_value": 0, "deals": []})
         
-        # Group by month
-        monthly_metrics = {}
         for deal in deals:
-            close_date = deal.get("properties", {}).get("closedate")
+            props = deal.get("properties", {})
+            deal_value = float(props.get("amount", 0) or 0)
+            total_value += deal_value
+            
+            close_date = props.get("closedate")
             if close_date:
                 # HubSpot timestamps are in milliseconds
                 date_obj = datetime.fromtimestamp(int(close_date) / 1000)
-                month_key = date_obj.strftime("%Y-%m")
-                
-                if month_key not in monthly_metrics:
-                    monthly_metrics[month_key] = {
-                        "count": 0,
-                        "total_value": 0,
-                        "deals": []
-                    }
-                
-                deal_value = float(deal.get("properties", {}).get("amount", 0) or 0)
-                monthly_metrics[month_key]["count"] += 1
-                monthly_metrics[month_key]["total_value"] += deal_value
-                monthly_metrics[month_key]["deals"].append({
-                    "name": deal.get("properties", {}).get("dealname", ""),
+                month = monthly_metrics[f"{date_obj.year:04d}-{date_obj.month:02d}"]
+                month["count"] += 1
+                month["total_value"] += deal_value
+                month["deals"].append({
+                    "name": props.get("dealname", ""),
                     "value": deal_value,
                     "close_date": close_date,
-                    "owner_id": deal.get("properties", {}).get("hubspot_owner_id", "")
+                    "owner_id": props.get("hubspot_owner_id", "")
                 })
         
         return {
@@ -199,7 +263,7 @@ class HubSpotClient:
                 "total_value": total_value,
                 "average_deal_size": total_value / max(total_deals, 1)
             },
-            "monthly_breakdown": monthly_metrics,
+            "monthly_breakdown": dict(monthly_metrics),
             "date_range": {
                 "start": start_date,
                 "end": end_date
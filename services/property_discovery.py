@@ -2,17 +2,36 @@
 Property Discovery Service for dynamically fetching and mapping HubSpot properties
 """
 
+import asyncio
+import functools
+import re
 import time
 from typing import Dict, List, Any, Optional
 from .hubspot_client import HubSpotClient
 
+# One camelCase word: its first character, then everything up to the next uppercase letter
+_CAMEL_WORD_RE = re.compile(r'.[^A-Z]*', re.DOTALL)
+
+# Spaces and hyphens in group names become underscores
+_GROUP_NAME_TRANS = str.maketrans(" -", "__")
 
 class PropertyDiscoveryService:
+    # Caches are process-wide: main.py and EncyclopediaService each create their own
+    # instance, and all of them should share one copy of every object type's properties
+    _cache: Dict[str, Dict[str, str]] = {}
+    _cache_expiry: Dict[str, float] = {}
+    # Raw property definitions, shared by the flat and hierarchical views
+    _raw_cache: Dict[str, List[Dict[str, Any]]] = {}
+    _raw_expiry: Dict[str, float] = {}
+    # One lock per object type, so concurrent misses make a single HubSpot request
+    _raw_fetch_locks: Dict[str, asyncio.Lock] = {}
+    # Background refreshes in flight, so expired entries are refetched once
+    _refresh_tasks: Dict[str, asyncio.Task] = {}
+    
     def __init__(self):
         self.hubspot_client = HubSpotClient()
-        self._cache = {}
-        self._cache_expiry = {}
         self.CACHE_DURATION = 3600  # 1 hour
+        self.STALE_DURATION = 4 * 3600  # serve stale mappings while refreshing, up to 4 hours old
     
     async def fetch_all_properties(self, object_type: str = "companies") -> Dict[str, str]:
         """
@@ -28,25 +47,41 @@ class PropertyDiscoveryService:
         if self._is_cache_valid(object_type):
             return self._cache.get(object_type, {})
         
+        # Expired but recent enough: serve it and refresh in the background
+        if self._is_cache_usable_stale(object_type):
+            if object_type not in self._refresh_tasks:
+                self._refresh_tasks[object_type] = asyncio.create_task(self._background_refresh(object_type))
+            return self._cache[object_type]
+        
         # Fetch fresh from HubSpot
         try:
-            endpoint = f"/crm/v3/properties/{object_type}"
-            response = await self.hubspot_client._make_request("GET", endpoint)
-            
-            properties = response.get("results", [])
-            mappings = self._process_properties(properties)
-            
-            # Cache the results
-            self._cache[object_type] = mappings
-            self._cache_expiry[object_type] = time.time() + self.CACHE_DURATION
-            
-            return mappings
+            return await self._fetch_and_cache_properties(object_type)
             
         except Exception as e:
             # Fallback to empty dict if API fails
             print(f"Warning: Could not fetch properties for {object_type}: {e}")
             return {}
     
+    async def _fetch_and_cache_properties(self, object_type: str) -> Dict[str, str]:
+        """Fetch property definitions, build readable mappings and cache them"""
+        properties = await self._fetch_raw_properties(object_type)
+        mappings = self._process_properties(properties)
+        
+        # Cache the results
+        self._cache[object_type] = mappings
+        self._cache_expiry[object_type] = time.time() + self.CACHE_DURATION
+        
+        return mappings
+    
+    async def _background_refresh(self, object_type: str):
+        """Refresh expired mappings without blocking callers, keeping the stale copy on failure"""
+        try:
+            await self._fetch_and_cache_properties(object_type)
+        except Exception as e:
+            print(f"Warning: Background refresh of properties for {object_type} failed: {e}")
+        finally:
+            self._refresh_tasks.pop(object_type, None)
+    
     async def fetch_hierarchical_properties(self, object_type: str = "companies") -> Dict[str, Dict[str, Any]]:
         """
         Fetch properties organized by property groups for hierarchical encyclopedia
@@ -58,16 +93,41 @@ class PropertyDiscoveryService:
             Dictionary mapping group_name -> {properties: {}, metadata: {}}
         """
         try:
-            endpoint = f"/crm/v3/properties/{object_type}"
-            response = await self.hubspot_client._make_request("GET", endpoint)
-            
-            properties = response.get("results", [])
+            properties = await self._fetch_raw_properties(object_type)
             return self._organize_by_groups(properties)
             
         except Exception as e:
             print(f"Warning: Could not fetch hierarchical properties for {object_type}: {e}")
             return {}
     
+    async def _fetch_raw_properties(self, object_type: str) -> List[Dict[str, Any]]:
+        """
+        Fetch raw property definitions for an object type, reusing them for CACHE_DURATION
+        
+        Both fetch_all_properties and fetch_hierarchical_properties read the same
+        endpoint, so callers needing both views make one HubSpot request.
+        """
+        if self._is_raw_cache_valid(object_type):
+            return self._raw_cache[object_type]
+        
+        lock = self._raw_fetch_locks.setdefault(object_type, asyncio.Lock())
+        async with lock:
+            # Another caller may have fetched while we waited for the lock
+            if self._is_raw_cache_valid(object_type):
+                return self._raw_cache[object_type]
+            
+            endpoint = f"/crm/v3/properties/{object_type}"
+            response = await self.hubspot_client._make_request("GET", endpoint)
+            
+            properties = response.get("results", [])
+            self._raw_cache[object_type] = properties
+            self._raw_expiry[object_type] = time.time() + self.CACHE_DURATION
+            return properties
+    
+    def _is_raw_cache_valid(self, object_type: str) -> bool:
+        """Check if cached raw property definitions are still valid"""
+        return object_type in self._raw_cache and time.time() < self._raw_expiry.get(object_type, 0)
+    
     def _organize_by_groups(self, raw_properties: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
         """
         Organize properties by their HubSpot property groups
@@ -79,6 +139,8 @@ class PropertyDiscoveryService:
             Dictionary organized by property groups
         """
         groups = {}
+        normalize_group_name = self._normalize_group_name
+        readable_name = self._readable_name
         
         for prop in raw_properties:
             internal_name = prop.get("name", "")
@@ -87,13 +149,15 @@ class PropertyDiscoveryService:
             
             # Get property group (HubSpot API includes groupName)
             group_name = prop.get("groupName", "other")
+            prop_type = prop.get("type", "string")
             
             # Normalize group name for consistency
-            normalized_group = self._normalize_group_name(group_name)
+            normalized_group = normalize_group_name(group_name)
             
             # Initialize group if not exists
-            if normalized_group not in groups:
-                groups[normalized_group] = {
+            group = groups.get(normalized_group)
+            if group is None:
+                group = groups[normalized_group] = {
                     "display_name": self._humanize_group_name(group_name),
                     "properties": {},
                     "property_count": 0,
@@ -101,25 +165,28 @@ class PropertyDiscoveryService:
                 }
             
             # Add property to group
-            readable_name = self._make_readable_name(prop)
-            groups[normalized_group]["properties"][internal_name] = {
-                "label": readable_name,
-                "type": prop.get("type", "string"),
+            group["properties"][internal_name] = {
+                "label": readable_name(internal_name, prop.get("label", "")),
+                "type": prop_type,
                 "description": prop.get("description", ""),
-                "options": prop.get("options", []) if prop.get("type") == "enumeration" else []
+                "options": prop.get("options", []) if prop_type == "enumeration" else []
             }
-            groups[normalized_group]["property_count"] += 1
+            group["property_count"] += 1
         
         return groups
     
-    def _normalize_group_name(self, group_name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _normalize_group_name(group_name: str) -> str:
         """Normalize group name for consistent keys"""
         if not group_name:
             return "other"
         
-        return group_name.lower().replace(" ", "_").replace("-", "_")
+        return group_name.lower().translate(_GROUP_NAME_TRANS)
     
-    def _humanize_group_name(self, group_name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _humanize_group_name(group_name: str) -> str:
         """Convert group name to human-readable format"""
         if not group_name:
             return "Other Properties"
@@ -135,7 +202,7 @@ class PropertyDiscoveryService:
             "conversion_information": "Conversion Information"
         }
         
-        normalized = group_name.lower().replace(" ", "_").replace("-", "_")
+        normalized = group_name.lower().translate(_GROUP_NAME_TRANS)
         
         if normalized in group_map:
             return group_map[normalized]
@@ -154,6 +221,7 @@ class PropertyDiscoveryService:
             Dictionary mapping internal_name -> human_readable_name
         """
         mappings = {}
+        readable_name = self._readable_name
         
         for prop in raw_properties:
             internal_name = prop.get("name", "")
@@ -161,8 +229,7 @@ class PropertyDiscoveryService:
                 continue
             
             # Try to get a good human-readable name
-            readable_name = self._make_readable_name(prop)
-            mappings[internal_name] = readable_name
+            mappings[internal_name] = readable_name(internal_name, prop.get("label", ""))
         
         return mappings
     
@@ -175,46 +242,50 @@ class PropertyDiscoveryService:
         2. Humanized internal name
         3. Raw internal name as fallback
         """
-        internal_name = property_def.get("name", "")
-        label = property_def.get("label", "")
-        
+        return self._readable_name(property_def.get("name", ""), property_def.get("label", ""))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _readable_name(internal_name: str, label: str) -> str:
+        """Readable name for an (internal name, label) pair; memoized across fetches and refreshes"""
         # Try to use label if it's clean and readable
-        if label and self._is_clean_label(label):
-            return self._clean_label(label)
+        if label and PropertyDiscoveryService._is_clean_label(label):
+            return PropertyDiscoveryService._clean_label(label)
         
         # Fallback to humanized internal name
-        return self._humanize_internal_name(internal_name)
+        return PropertyDiscoveryService._humanize_internal_name(internal_name)
     
-    def _is_clean_label(self, label: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _is_clean_label(label: str) -> bool:
         """Check if label is already human-readable"""
-        if not label:
+        # Simple heuristics for clean labels, cheapest first: has spaces,
+        # isn't snake_case, has a reasonable length and isn't all lowercase
+        if not label or " " not in label or "_" in label:
             return False
         
-        # Skip labels that look like internal names
-        problematic_patterns = [
-            "_", "camelCase", "ALLCAPS", "snake_case"
-        ]
-        
-        # Simple heuristics for clean labels
-        has_spaces = " " in label
-        not_all_lowercase = not label.islower()
-        not_snake_case = "_" not in label
-        reasonable_length = 3 <= len(label) <= 50
+        if not 3 <= len(label) <= 50:
+            return False
         
-        return has_spaces and not_all_lowercase and not_snake_case and reasonable_length
+        return not label.islower()
     
-    def _clean_label(self, label: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _clean_label(label: str) -> str:
         """Clean up a mostly-good label"""
         # Basic cleanup
         cleaned = label.strip()
         
         # Ensure proper title case
-        if not any(c.isupper() for c in cleaned[1:]):  # If not already title case
+        rest = cleaned[1:]
+        if rest.lower() == rest:  # If not already title case (no capitals after the first character)
             cleaned = cleaned.title()
         
         return cleaned
     
-    def _humanize_internal_name(self, internal_name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _humanize_internal_name(internal_name: str) -> str:
         """Convert internal_name to human-readable format"""
         if not internal_name:
             return ""
@@ -230,22 +301,10 @@ class PropertyDiscoveryService:
             return " ".join(word.capitalize() for word in words if word)
         
         # Convert camelCase to Title Case
-        if any(c.isupper() for c in name[1:]):
-            # Simple camelCase splitting
-            result = []
-            current_word = []
-            
-            for char in name:
-                if char.isupper() and current_word:
-                    result.append("".join(current_word))
-                    current_word = [char.lower()]
-                else:
-                    current_word.append(char.lower())
-            
-            if current_word:
-                result.append("".join(current_word))
-            
-            return " ".join(word.capitalize() for word in result)
+        rest = name[1:]
+        if rest.lower() != rest:
+            # Simple camelCase splitting: a new word starts at each uppercase letter
+            return " ".join(word.capitalize() for word in _CAMEL_WORD_RE.findall(name))
         
         # Fallback: just capitalize
         return name.replace("-", " ").title()
@@ -258,6 +317,14 @@ class PropertyDiscoveryService:
         expiry_time = self._cache_expiry.get(object_type, 0)
         return time.time() < expiry_time
     
+    def _is_cache_usable_stale(self, object_type: str) -> bool:
+        """Check if expired cached data is still recent enough to serve while refreshing"""
+        if object_type not in self._cache:
+            return False
+        
+        expiry_time = self._cache_expiry.get(object_type, 0)
+        return time.time() < expiry_time - self.CACHE_DURATION + self.STALE_DURATION
+    
     async def get_property_info(self, object_type: str, property_name: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific property
@@ -299,9 +366,16 @@ class PropertyDiscoveryService:
                 del self._cache[obj_type]
             if obj_type in self._cache_expiry:
                 del self._cache_expiry[obj_type]
-            
-            # Fetch fresh data
-            mappings = await self.fetch_all_properties(obj_type)
-            results[obj_type] = len(mappings)
+            self._raw_cache.pop(obj_type, None)
+            self._raw_expiry.pop(obj_type, None)
+        
+        # Fetch fresh data for all object types concurrently
+        all_mappings = await asyncio.gather(
+            *(self.fetch_all_properties(obj_type) for obj_type in object_types),
+            return_exceptions=True
+        )
+        
+        for obj_type, mappings in zip(object_types, all_mappings):
+            results[obj_type] = 0 if isinstance(mappings, Exception) else len(mappings)
         
         return results
\ No newline at end of file
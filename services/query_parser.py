@@ -2,42 +2,200 @@
 Natural language query parser for converting human queries to HubSpot API filters
 """
 
+import asyncio
+import copy
+import functools
 import re
+import time
+import types
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from config.mappings import REVERSE_PROPERTY_MAPPINGS, REVERSE_VALUE_MAPPINGS
 from .value_discovery import ValueDiscoveryService
 
+# Common operators and their HubSpot equivalents (read-only, shared by every parser)
+_OPERATORS = types.MappingProxyType({
+    "equals": "EQ",
+    "is": "EQ", 
+    "=": "EQ",
+    "==": "EQ",
+    "not equals": "NEQ",
+    "is not": "NEQ",
+    "!=": "NEQ",
+    "greater than": "GT",
+    ">": "GT",
+    "less than": "LT",
+    "<": "LT",
+    "greater than or equal": "GTE",
+    ">=": "GTE",
+    "less than or equal": "LTE",
+    "<=": "LTE",
+    "contains": "CONTAINS_TOKEN",
+    "includes": "CONTAINS_TOKEN",
+    "has": "CONTAINS_TOKEN",
+    "starts with": "STARTS_WITH",
+    "ends with": "ENDS_WITH",
+    "in": "IN",
+    "not in": "NOT_IN"
+})
+
+# Property names are compared with case, spaces and underscores ignored, so
+# "annual revenue", "annual_revenue" and "Annual Revenue" all find the same mapping.
+# Internal names are indexed too, after the labels, so "hubspotownerid" or
+# "hubspot owner id" resolve to "hubspot_owner_id" without a variation search
+_PROPERTY_KEY_TRANS = str.maketrans("", "", " _")
+_CANONICAL_PROPERTY_MAPPINGS = {}
+for _label, _internal_name in REVERSE_PROPERTY_MAPPINGS.items():
+    _CANONICAL_PROPERTY_MAPPINGS.setdefault(_label.lower().translate(_PROPERTY_KEY_TRANS), _internal_name)
+for _internal_name in REVERSE_PROPERTY_MAPPINGS.values():
+    _CANONICAL_PROPERTY_MAPPINGS.setdefault(_internal_name.lower().translate(_PROPERTY_KEY_TRANS), _internal_name)
+
+
+@functools.lru_cache(maxsize=1024)
+def _hubspot_property_name(readable_name: str) -> str:
+    """Map a human-readable property name to its HubSpot name (memoized; names repeat across queries)"""
+    # Clean up the property name (it comes from a query parse() has already lowercased)
+    cleaned_name = readable_name.strip()
+    
+    # One lookup covers the spacing/underscore variations of the label
+    hubspot_property = _CANONICAL_PROPERTY_MAPPINGS.get(cleaned_name.translate(_PROPERTY_KEY_TRANS))
+    if hubspot_property is not None:
+        return hubspot_property
+    
+    # Return as-is with underscores if no mapping found
+    return cleaned_name.replace(' ', '_')
+
+
+# Static value labels keyed by their lowercased form, since query values arrive lowercased
+_LOWERCASE_VALUE_MAPPINGS = {
+    property_name: {label.lower(): internal_value for label, internal_value in values.items()}
+    for property_name, values in REVERSE_VALUE_MAPPINGS.items()
+}
+
+# "Recent" means created in the last 30 days; the cutoff is recomputed at most once a minute
+_RECENT_CUTOFF_TTL_SECONDS = 60
+_recent_cutoff_cache = {"computed_at": 0.0, "value": ""}
+
+
+def _thirty_days_ago_ms() -> str:
+    """HubSpot millisecond timestamp for 30 days ago, cached for _RECENT_CUTOFF_TTL_SECONDS"""
+    now = time.time()
+    if now - _recent_cutoff_cache["computed_at"] > _RECENT_CUTOFF_TTL_SECONDS:
+        _recent_cutoff_cache["value"] = str(int((datetime.now() - timedelta(days=30)).timestamp() * 1000))
+        _recent_cutoff_cache["computed_at"] = now
+    return _recent_cutoff_cache["value"]
+
+
+# Parsed queries are reused for repeat requests (pagination, refreshes). The TTL keeps
+# Value Discovery mappings and the "recent" cutoff in cached results from going stale
+_PARSE_CACHE_TTL_SECONDS = 60
+_PARSE_CACHE_MAX_ENTRIES = 512
+
+# Value Discovery label lookups are memoized per parser; common labels ("Active",
+# "Tyler Beagley") recur across otherwise different queries
+_VALUE_CACHE_TTL_SECONDS = 60
+_VALUE_CACHE_MAX_ENTRIES = 1024
+
+# The patterns below match queries that parse() has already lowercased, so they are
+# compiled without re.IGNORECASE
+
+# Basic comparisons in one pattern: "property operator value" or "property in (a, b)" /
+# "property not in [a, b]", so the query is scanned once for all of them. Operators are
+# listed longest first so "is not" wins over "is", "greater than or equal" over
+# "greater than" and ">=" over ">". The property is matched lazily so the operator is the
+# first one after it, rather than "or"/"not" being absorbed into the property name
+_COMPARISON_RE = re.compile(
+    r'(?P<prop>\w+(?:\s+\w+)*?)\s+(?:'
+    r'(?P<op>greater than or equal|less than or equal|not equals?|greater than|less than|starts with|ends with|contains?|includes?|equals?|is not|is|has|==|!=|>=|<=|=|>|<)\s+(?P<value>[^\s,]+(?:\s+[^\s,]+)*)'
+    r'|(?P<list_op>in|not in)\s+(?:\((?P<paren_values>[^)]+)\)|\[(?P<bracket_values>[^\]]+)\]))'
+)
+
+# Sort/limit/properties patterns in priority order, each paired with a literal keyword it
+# can't match without. One keyword scan finds which patterns are worth running at all
+_SORT_PATTERNS = [
+    ("sort by ", re.compile(r'sort by (\w+(?:\s+\w+)*)\s*(asc|desc|ascending|descending)?')),
+    ("order by ", re.compile(r'order by (\w+(?:\s+\w+)*)\s*(asc|desc|ascending|descending)?'))
+]
+
+_LIMIT_PATTERNS = [
+    ("limit ", re.compile(r'limit (\d+)')),
+    ("top ", re.compile(r'top (\d+)')),
+    ("first ", re.compile(r'first (\d+)')),
+    ("show ", re.compile(r'show (\d+)')),
+    (" result", re.compile(r'(\d+) results?'))
+]
+
+_PROPERTIES_PATTERNS = [
+    ("show ", re.compile(r'show (?:me )?(?:only )?([^,]+(?:,\s*[^,]+)*)')),
+    ("return ", re.compile(r'return ([^,]+(?:,\s*[^,]+)*)')),
+    ("include ", re.compile(r'include ([^,]+(?:,\s*[^,]+)*)'))
+]
+
+_META_KEYWORDS_RE = re.compile(
+    "(?=(" + "|".join(sorted({
+        re.escape(keyword)
+        for patterns in (_SORT_PATTERNS, _LIMIT_PATTERNS, _PROPERTIES_PATTERNS)
+        for keyword, _ in patterns
+    })) + "))"
+)
+
+# Special-case trigger phrases -> the case they trigger (synonyms share a case)
+_SPECIAL_PHRASES = types.MappingProxyType({
+    "tyler beagley": "tyler beagley",
+    "tyler's": "tyler beagley",
+    "active": "active",
+    "cancelled": "cancelled",
+    "canceled": "cancelled",
+    "inactive": "inactive",
+    "technology": "technology",
+    "tech": "technology",
+    "large companies": "large companies",
+    "big companies": "large companies",
+    "small companies": "small companies",
+    "enterprise": "enterprise",
+    "high revenue": "high revenue",
+    "recent": "recent",
+    "recently created": "recent"
+})
+
+# Label-mapping special cases, in the order their filters are emitted:
+# (case, property, literal label, fallback filter when the label has no internal value).
+# Fallback filters are read-only templates; callers get a dict copy
+_SPECIAL_CASE_LABELS = (
+    # Owner-based queries - literal name mapping
+    ("tyler beagley", "hubspot_owner_id", "Tyler Beagley", None),
+    # Status-based queries - literal label mapping
+    ("active", "account_status", "Active", None),
+    ("cancelled", "account_status", "Cancelled", None),
+    ("inactive", "account_status", "Inactive", None),
+    # Industry-based queries - literal label mapping
+    ("technology", "industry", "Technology", None),
+    # Company size queries - map to literal tier labels, falling back to employee count
+    ("large companies", "customer_tier", "Large", types.MappingProxyType({"propertyName": "numberofemployees", "operator": "GT", "value": "1000"})),
+    ("small companies", "customer_tier", "Small", types.MappingProxyType({"propertyName": "numberofemployees", "operator": "LT", "value": "100"})),
+    # Enterprise/tier queries - literal label mapping
+    ("enterprise", "customer_tier", "Enterprise", None),
+    # Revenue-based queries - try tier mapping first, then fallback to amount
+    ("high revenue", "customer_tier", "High Revenue", types.MappingProxyType({"propertyName": "annualrevenue", "operator": "GT", "value": "1000000"}))
+)
+
+# Finds every trigger phrase in one scan. The lookahead matches at each position, so
+# overlapping phrases are all reported ("inactive" also yields "active"), just like
+# separate substring checks; phrases sharing a start position are synonyms
+_SPECIAL_PHRASES_RE = re.compile(
+    "(?=(" + "|".join(re.escape(phrase) for phrase in sorted(_SPECIAL_PHRASES, key=len, reverse=True)) + "))"
+)
+
 class QueryParser:
     def __init__(self):
         self.property_mappings = REVERSE_PROPERTY_MAPPINGS
         self.value_mappings = REVERSE_VALUE_MAPPINGS
         self.value_discovery = ValueDiscoveryService()
-        
-        # Common operators and their HubSpot equivalents
-        self.operators = {
-            "equals": "EQ",
-            "is": "EQ", 
-            "=": "EQ",
-            "==": "EQ",
-            "not equals": "NEQ",
-            "is not": "NEQ",
-            "!=": "NEQ",
-            "greater than": "GT",
-            ">": "GT",
-            "less than": "LT",
-            "<": "LT",
-            "greater than or equal": "GTE",
-            ">=": "GTE",
-            "less than or equal": "LTE",
-            "<=": "LTE",
-            "contains": "CONTAINS_TOKEN",
-            "includes": "CONTAINS_TOKEN",
-            "has": "CONTAINS_TOKEN",
-            "starts with": "STARTS_WITH",
-            "ends with": "ENDS_WITH",
-            "in": "IN",
-            "not in": "NOT_IN"
-        }
+        # Normalized query -> (parsed_at, result), least recently used first
+        self._parse_cache = OrderedDict()
+        # (object_type, property_name, value) -> (looked_up_at, internal_value), least recently used first
+        self._value_cache = OrderedDict()
     
     async def parse(self, query: str) -> Dict[str, Any]:
         """
@@ -51,6 +209,23 @@ class QueryParser:
         """
         query = query.lower().strip()
         
+        cached = self._parse_cache.get(query)
+        if cached and time.monotonic() - cached[0] < _PARSE_CACHE_TTL_SECONDS:
+            self._parse_cache.move_to_end(query)
+            # Callers may modify the filters, so never hand out the cached objects
+            return copy.deepcopy(cached[1])
+        
+        result = await self._parse_uncached(query)
+        
+        self._parse_cache[query] = (time.monotonic(), result)
+        self._parse_cache.move_to_end(query)
+        if len(self._parse_cache) > _PARSE_CACHE_MAX_ENTRIES:
+            self._parse_cache.popitem(last=False)
+        
+        return copy.deepcopy(result)
+    
+    async def _parse_uncached(self, query: str) -> Dict[str, Any]:
+        """Parse an already lowercased and stripped query"""
         # Initialize result structure
         result = {
             "filters": [],
@@ -63,18 +238,21 @@ class QueryParser:
         filters = await self._extract_filters(query)
         result["filters"] = filters
         
+        # Keywords present in the query decide which sort/limit/properties patterns can match
+        keywords = set(_META_KEYWORDS_RE.findall(query))
+        
         # Extract sorting information
-        sort_info = self._extract_sort(query)
+        sort_info = self._extract_sort(query, keywords)
         if sort_info:
             result["sort"] = sort_info
         
         # Extract limit information
-        limit = self._extract_limit(query)
+        limit = self._extract_limit(query, keywords)
         if limit:
             result["limit"] = limit
         
         # Extract specific properties to return
-        properties = self._extract_properties(query)
+        properties = self._extract_properties(query, keywords)
         if properties:
             result["properties"] = properties
         
@@ -84,48 +262,43 @@ class QueryParser:
         """Extract filter conditions from the query"""
         filters = []
         
-        # Pattern for basic comparisons: "property operator value"
-        comparison_patterns = [
-            r'(\w+(?:\s+\w+)*)\s+(equals?|is|=|==|not equals?|is not|!=|greater than|>|less than|<|>=|<=|contains?|includes?|has|starts with|ends with)\s+([^\s,]+(?:\s+[^\s,]+)*)',
-            r'(\w+(?:\s+\w+)*)\s+(in|not in)\s+\(([^)]+)\)',
-            r'(\w+(?:\s+\w+)*)\s+(in|not in)\s+\[([^\]]+)\]'
-        ]
-        
-        for pattern in comparison_patterns:
-            matches = re.finditer(pattern, query, re.IGNORECASE)
-            for match in matches:
-                property_name = match.group(1).strip()
-                operator = match.group(2).strip().lower()
-                value = match.group(3).strip()
+        for match in _COMPARISON_RE.finditer(query):
+            property_name = match.group("prop").strip()
+            list_operator = match.group("list_op")
+            if list_operator:
+                operator = list_operator
+                value = (match.group("paren_values") or match.group("bracket_values")).strip()
+            else:
+                operator = match.group("op")
+                value = match.group("value").strip()
+            
+            # Map human-readable property to HubSpot property
+            hubspot_property = self._map_property_name(property_name)
+            hubspot_operator = _OPERATORS.get(operator, "EQ")
+            
+            # Handle IN/NOT_IN operators with multiple values
+            if list_operator:
+                values = [v.strip().strip('"\'') for v in value.split(',')]
+                # Map values using Value Discovery - literal mapping only
+                mapped_values = list(await asyncio.gather(*(
+                    self._map_property_value(hubspot_property, v) for v in values
+                )))
                 
-                # Map human-readable property to HubSpot property
-                hubspot_property = self._map_property_name(property_name)
-                hubspot_operator = self.operators.get(operator, "EQ")
+                filters.append({
+                    "propertyName": hubspot_property,
+                    "operator": hubspot_operator,
+                    "values": mapped_values
+                })
+            else:
+                # Single value operators
+                value = value.strip('"\'')
+                mapped_value = await self._map_property_value(hubspot_property, value)
                 
-                # Handle IN/NOT_IN operators with multiple values
-                if operator in ["in", "not in"]:
-                    values = [v.strip().strip('"\'') for v in value.split(',')]
-                    # Map values using Value Discovery - literal mapping only
-                    mapped_values = []
-                    for v in values:
-                        mapped_value = await self._map_property_value(hubspot_property, v)
-                        mapped_values.append(mapped_value)
-                    
-                    filters.append({
-                        "propertyName": hubspot_property,
-                        "operator": hubspot_operator,
-                        "values": mapped_values
-                    })
-                else:
-                    # Single value operators
-                    value = value.strip('"\'')
-                    mapped_value = await self._map_property_value(hubspot_property, value)
-                    
-                    filters.append({
-                        "propertyName": hubspot_property,
-                        "operator": hubspot_operator,
-                        "value": mapped_value
-                    })
+                filters.append({
+                    "propertyName": hubspot_property,
+                    "operator": hubspot_operator,
+                    "value": mapped_value
+                })
         
         # Handle special cases and common phrases
         special_filters = await self._handle_special_cases(query)
@@ -134,146 +307,52 @@ class QueryParser:
         return filters
     
     async def _handle_special_cases(self, query: str) -> List[Dict[str, Any]]:
-        """Handle literal label mappings using Value Discovery for ALL labels"""
+        """Handle literal label mappings using Value Discovery for ALL labels (query is already lowercased)"""
         filters = []
-        
-        # Owner-based queries - literal name mapping
-        if "tyler beagley" in query.lower() or "tyler's" in query.lower():
-            tyler_id = await self.value_discovery.map_value_to_internal("companies", "hubspot_owner_id", "Tyler Beagley")
-            if tyler_id != "Tyler Beagley":
+        cases = {_SPECIAL_PHRASES[phrase] for phrase in _SPECIAL_PHRASES_RE.findall(query)}
+        if not cases:
+            return filters
+        
+        # Look up every triggered label concurrently, then emit filters in table order
+        triggered = [entry for entry in _SPECIAL_CASE_LABELS if entry[0] in cases]
+        internal_values = await asyncio.gather(*(
+            self._map_value_to_internal("companies", property_name, label)
+            for _, property_name, label, _ in triggered
+        ))
+        
+        for (case, property_name, label, fallback_filter), internal_value in zip(triggered, internal_values):
+            if internal_value != label:
                 filters.append({
-                    "propertyName": "hubspot_owner_id",
+                    "propertyName": property_name,
                     "operator": "EQ",
-                    "value": tyler_id
-                })
-        
-        # Status-based queries - literal label mapping
-        if "active" in query.lower():
-            active_status = await self.value_discovery.map_value_to_internal("companies", "account_status", "Active")
-            if active_status != "Active":
-                filters.append({
-                    "propertyName": "account_status",
-                    "operator": "EQ",
-                    "value": active_status
-                })
-        
-        if "cancelled" in query.lower() or "canceled" in query.lower():
-            cancelled_status = await self.value_discovery.map_value_to_internal("companies", "account_status", "Cancelled")
-            if cancelled_status != "Cancelled":
-                filters.append({
-                    "propertyName": "account_status",
-                    "operator": "EQ", 
-                    "value": cancelled_status
-                })
-        
-        if "inactive" in query.lower():
-            inactive_status = await self.value_discovery.map_value_to_internal("companies", "account_status", "Inactive")
-            if inactive_status != "Inactive":
-                filters.append({
-                    "propertyName": "account_status",
-                    "operator": "EQ",
-                    "value": inactive_status
-                })
-        
-        # Industry-based queries - literal label mapping
-        if "technology" in query.lower() or "tech" in query.lower():
-            tech_industry = await self.value_discovery.map_value_to_internal("companies", "industry", "Technology")
-            if tech_industry != "Technology":
-                filters.append({
-                    "propertyName": "industry",
-                    "operator": "EQ",
-                    "value": tech_industry
-                })
-        
-        # Company size queries - map to literal tier labels
-        if "large companies" in query.lower() or "big companies" in query.lower():
-            # Try to map "Large" as a literal customer tier or company size label
-            large_tier = await self.value_discovery.map_value_to_internal("companies", "customer_tier", "Large")
-            if large_tier != "Large":
-                filters.append({
-                    "propertyName": "customer_tier",
-                    "operator": "EQ",
-                    "value": large_tier
-                })
-            else:
-                # Fallback to employee count if no tier mapping
-                filters.append({
-                    "propertyName": "numberofemployees",
-                    "operator": "GT",
-                    "value": "1000"
-                })
-        
-        if "small companies" in query.lower():
-            small_tier = await self.value_discovery.map_value_to_internal("companies", "customer_tier", "Small")
-            if small_tier != "Small":
-                filters.append({
-                    "propertyName": "customer_tier",
-                    "operator": "EQ",
-                    "value": small_tier
-                })
-            else:
-                # Fallback to employee count if no tier mapping
-                filters.append({
-                    "propertyName": "numberofemployees",
-                    "operator": "LT",
-                    "value": "100"
-                })
-        
-        # Enterprise/tier queries - literal label mapping
-        if "enterprise" in query.lower():
-            enterprise_tier = await self.value_discovery.map_value_to_internal("companies", "customer_tier", "Enterprise")
-            if enterprise_tier != "Enterprise":
-                filters.append({
-                    "propertyName": "customer_tier",
-                    "operator": "EQ",
-                    "value": enterprise_tier
-                })
-        
-        # Revenue-based queries - try tier mapping first, then fallback to amount
-        if "high revenue" in query.lower():
-            high_revenue_tier = await self.value_discovery.map_value_to_internal("companies", "customer_tier", "High Revenue")
-            if high_revenue_tier != "High Revenue":
-                filters.append({
-                    "propertyName": "customer_tier",
-                    "operator": "EQ",
-                    "value": high_revenue_tier
-                })
-            else:
-                # Fallback to revenue amount if no tier mapping
-                filters.append({
-                    "propertyName": "annualrevenue",
-                    "operator": "GT",
-                    "value": "1000000"
+                    "value": internal_value
                 })
+            elif fallback_filter:
+                filters.append(dict(fallback_filter))
         
         # Date-based queries - for "recent" we keep the logic since it's not a label
-        if "recent" in query.lower() or "recently created" in query.lower():
-            from datetime import datetime, timedelta
-            thirty_days_ago = int((datetime.now() - timedelta(days=30)).timestamp() * 1000)
+        if "recent" in cases:
             filters.append({
                 "propertyName": "createdate",
                 "operator": "GTE",
-                "value": str(thirty_days_ago)
+                "value": _thirty_days_ago_ms()
             })
         
         return filters
     
-    def _extract_sort(self, query: str) -> Optional[Dict[str, str]]:
+    def _extract_sort(self, query: str, keywords: set) -> Optional[Dict[str, str]]:
         """Extract sorting information from query"""
-        sort_patterns = [
-            r'sort by (\w+(?:\s+\w+)*)\s*(asc|desc|ascending|descending)?',
-            r'order by (\w+(?:\s+\w+)*)\s*(asc|desc|ascending|descending)?'
-        ]
-        
-        for pattern in sort_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for keyword, pattern in _SORT_PATTERNS:
+            if keyword not in keywords:
+                continue
+            match = pattern.search(query)
             if match:
                 property_name = match.group(1).strip()
                 direction = match.group(2)
                 
                 hubspot_property = self._map_property_name(property_name)
                 
-                if direction and direction.lower() in ['desc', 'descending']:
+                if direction in ('desc', 'descending'):
                     direction = 'DESCENDING'
                 else:
                     direction = 'ASCENDING'
@@ -285,33 +364,23 @@ class QueryParser:
         
         return None
     
-    def _extract_limit(self, query: str) -> Optional[int]:
+    def _extract_limit(self, query: str, keywords: set) -> Optional[int]:
         """Extract limit/count information from query"""
-        limit_patterns = [
-            r'limit (\d+)',
-            r'top (\d+)',
-            r'first (\d+)',
-            r'show (\d+)',
-            r'(\d+) results?'
-        ]
-        
-        for pattern in limit_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for keyword, pattern in _LIMIT_PATTERNS:
+            if keyword not in keywords:
+                continue
+            match = pattern.search(query)
             if match:
                 return int(match.group(1))
         
         return None
     
-    def _extract_properties(self, query: str) -> Optional[List[str]]:
+    def _extract_properties(self, query: str, keywords: set) -> Optional[List[str]]:
         """Extract specific properties to return from query"""
-        properties_patterns = [
-            r'show (?:me )?(?:only )?([^,]+(?:,\s*[^,]+)*)',
-            r'return ([^,]+(?:,\s*[^,]+)*)',
-            r'include ([^,]+(?:,\s*[^,]+)*)'
-        ]
-        
-        for pattern in properties_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for keyword, pattern in _PROPERTIES_PATTERNS:
+            if keyword not in keywords:
+                continue
+            match = pattern.search(query)
             if match:
                 properties_str = match.group(1)
                 properties = [p.strip() for p in properties_str.split(',')]
@@ -327,41 +396,39 @@ class QueryParser:
     
     def _map_property_name(self, readable_name: str) -> str:
         """Map human-readable property name to HubSpot property name"""
-        # Clean up the property name
-        cleaned_name = readable_name.lower().strip()
-        
-        # Direct mapping
-        if cleaned_name in self.property_mappings:
-            return self.property_mappings[cleaned_name]
-        
-        # Try common variations
-        variations = [
-            cleaned_name.replace(' ', '_'),
-            cleaned_name.replace(' ', ''),
-            cleaned_name.replace('_', ' ')
-        ]
-        
-        for variation in variations:
-            if variation in self.property_mappings:
-                return self.property_mappings[variation]
-        
-        # Return as-is with underscores if no mapping found
-        return cleaned_name.replace(' ', '_')
+        return _hubspot_property_name(readable_name)
     
     async def _map_property_value(self, property_name: str, value: str) -> str:
-        """Map human-readable property value to HubSpot value using Value Discovery"""
+        """Map human-readable property value to HubSpot value using Value Discovery (value is already lowercased)"""
         # First try static mappings for backward compatibility
-        if property_name in self.value_mappings:
-            value_lower = value.lower()
-            mapping = self.value_mappings[property_name]
-            static_result = mapping.get(value_lower, value)
+        mapping = _LOWERCASE_VALUE_MAPPINGS.get(property_name)
+        if mapping is not None:
+            static_result = mapping.get(value, value)
             if static_result != value:
                 return static_result
         
         # Use Value Discovery for dynamic mapping
         try:
-            dynamic_result = await self.value_discovery.map_value_to_internal("companies", property_name, value)
+            # A value the user typed is worth typo correction; special-case label probes aren't
+            dynamic_result = await self._map_value_to_internal("companies", property_name, value, fuzzy=True)
             return dynamic_result
         except Exception as e:
             print(f"Warning: Could not map value '{value}' for property '{property_name}': {e}")
-            return value
\ No newline at end of file
+            return value
+    
+    async def _map_value_to_internal(self, object_type: str, property_name: str, value: str, fuzzy: bool = False) -> str:
+        """Value Discovery label lookup, memoized for _VALUE_CACHE_TTL_SECONDS (failures aren't cached)"""
+        key = (object_type, property_name, value, fuzzy)
+        cached = self._value_cache.get(key)
+        if cached and time.monotonic() - cached[0] < _VALUE_CACHE_TTL_SECONDS:
+            self._value_cache.move_to_end(key)
+            return cached[1]
+        
+        internal_value = await self.value_discovery.map_value_to_internal(object_type, property_name, value, fuzzy=fuzzy)
+        
+        self._value_cache[key] = (time.monotonic(), internal_value)
+        self._value_cache.move_to_end(key)
+        if len(self._value_cache) > _VALUE_CACHE_MAX_ENTRIES:
+            self._value_cache.popitem(last=False)
+        
+        return internal_value
\ No newline at end of file
@@ -2,15 +2,60 @@
 Property translator for converting between HubSpot property names/values and human-readable formats
 """
 
-from typing import Dict, Any, Optional
+import functools
+from datetime import datetime
+from typing import Dict, List, Any, Optional
 from config.mappings import PROPERTY_MAPPINGS, VALUE_MAPPINGS, REVERSE_PROPERTY_MAPPINGS, REVERSE_VALUE_MAPPINGS
 
+# Properties rendered as abbreviated numbers
+_NUMBER_PROPERTIES = frozenset({"annualrevenue", "numberofemployees"})
+
+# Property names whose values are rendered as dates; the known ones are precomputed
+_DATE_PROPERTIES = frozenset(name for name in PROPERTY_MAPPINGS if "date" in name.lower())
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_date_property(property_name: str) -> bool:
+    """Whether a property holds a date (any name containing "date", e.g. createdate)"""
+    return property_name in _DATE_PROPERTIES or "date" in property_name.lower()
+
+
+# (threshold, divisor, suffix) for abbreviated numbers, largest first
+_SCALES = ((1_000_000, 1e6, "M"), (1_000, 1e3, "K"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_number_value(number_value) -> str:
+    """Format a number for readability; cached because revenue/headcount values recur across companies"""
+    try:
+        num = float(number_value)
+        for threshold, divisor, suffix in _SCALES:
+            if num >= threshold:
+                return f"{num/divisor:.1f}{suffix}"
+        return f"{int(num):,}"
+    except (ValueError, TypeError):
+        return str(number_value)
+
+
+def _lowercase_keys(value_mappings: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Copy per-property value mappings with every value key lowercased"""
+    return {
+        property_name: {str(key).lower(): value for key, value in values.items()}
+        for property_name, values in value_mappings.items()
+    }
+
+
 class PropertyTranslator:
     def __init__(self):
         self.property_mappings = PROPERTY_MAPPINGS
         self.value_mappings = VALUE_MAPPINGS
         self.reverse_property_mappings = REVERSE_PROPERTY_MAPPINGS
         self.reverse_value_mappings = REVERSE_VALUE_MAPPINGS
+        
+        # Value lookups keyed by lowercased value, matching how translate_property_value
+        # normalizes its input; the mappings above keep their original casing
+        self._value_lookup = _lowercase_keys(VALUE_MAPPINGS)
+        self._reverse_value_lookup = _lowercase_keys(REVERSE_VALUE_MAPPINGS)
     
     def translate_property_name(self, property_name: str, reverse: bool = False) -> str:
         """
@@ -48,12 +93,19 @@ class PropertyTranslator:
         if value is None:
             return value
         
-        value_str = str(value).lower()
-        
         if reverse:
-            mapping = self.reverse_value_mappings.get(property_name, {})
+            mapping = self._reverse_value_lookup.get(property_name)
         else:
-            mapping = self.value_mappings.get(property_name, {})
+            mapping = self._value_lookup.get(property_name)
+        
+        # Most properties have no value mapping; skip building the lookup key for them
+        if mapping is None:
+            return value
+        
+        if isinstance(value, str):
+            value_str = value if value.islower() else value.lower()
+        else:
+            value_str = str(value).lower()
         
         return mapping.get(value_str, value)
     
@@ -70,34 +122,49 @@ class PropertyTranslator:
         if not company or "properties" not in company:
             return company
         
-        translated_company = {
+        return {
             "id": company.get("id"),
             "created_at": company.get("createdAt"),
             "updated_at": company.get("updatedAt"),
             "archived": company.get("archived", False),
-            "properties": {}
+            "properties": dict(self._iter_translated_properties(company.get("properties", {})))
         }
-        
-        original_properties = company.get("properties", {})
-        
-        for property_name, value in original_properties.items():
-            # Translate property name
-            readable_name = self.translate_property_name(property_name)
-            
+    
+    def _iter_translated_properties(self, properties: Dict[str, Any]):
+        """Yield (readable name, readable value) pairs for a company's raw properties"""
+        # Bind lookups once rather than per property
+        property_mappings_get = self.property_mappings.get
+        translate_value = self.translate_property_value
+        format_date = self._format_date
+        format_number = self._format_number
+        is_date_property = _is_date_property
+        number_properties = _NUMBER_PROPERTIES
+        
+        for property_name, value in properties.items():
             # Translate property value if mapping exists
-            readable_value = self.translate_property_value(property_name, value)
+            readable_value = translate_value(property_name, value)
             
-            # Format dates for better readability
-            if readable_value and ("date" in property_name.lower() or "createdate" in property_name.lower()):
-                readable_value = self._format_date(readable_value)
+            if readable_value:
+                # Format dates and numbers for better readability
+                if is_date_property(property_name):
+                    readable_value = format_date(readable_value)
+                if property_name in number_properties:
+                    readable_value = format_number(readable_value)
             
-            # Format numbers for better readability
-            if readable_value and property_name in ["annualrevenue", "numberofemployees"]:
-                readable_value = self._format_number(readable_value)
-            
-            translated_company["properties"][readable_name] = readable_value
+            yield property_mappings_get(property_name, property_name), readable_value
+    
+    def translate_companies(self, companies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Translate a list of company objects to human-readable format
+        
+        Args:
+            companies: Company objects from HubSpot API
         
-        return translated_company
+        Returns:
+            List of companies with translated property names and values
+        """
+        translate_company = self.translate_company_properties
+        return [translate_company(company) for company in companies]
     
     def translate_query_filters(self, filters: list) -> list:
         """
@@ -109,44 +176,33 @@ class PropertyTranslator:
         Returns:
             List of filters with HubSpot property names
         """
-        translated_filters = []
-        
-        for filter_obj in filters:
-            translated_filter = filter_obj.copy()
-            
-            # Translate property name
-            if "propertyName" in translated_filter:
-                property_name = translated_filter["propertyName"]
-                translated_filter["propertyName"] = self.translate_property_name(
-                    property_name, reverse=True
-                )
-            
-            # Translate filter values
-            if "value" in translated_filter:
-                original_property = translated_filter["propertyName"]
-                translated_filter["value"] = self.translate_property_value(
-                    original_property, 
-                    translated_filter["value"], 
-                    reverse=True
-                )
-            
-            if "values" in translated_filter:
-                original_property = translated_filter["propertyName"]
-                translated_filter["values"] = [
-                    self.translate_property_value(original_property, val, reverse=True)
-                    for val in translated_filter["values"]
-                ]
-            
-            translated_filters.append(translated_filter)
-        
-        return translated_filters
+        return [self._translate_filter(filter_obj) for filter_obj in filters]
+    
+    def _translate_filter(self, filter_obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate one filter, resolving its HubSpot property name once"""
+        readable_name = filter_obj.get("propertyName")
+        if readable_name is None:
+            return dict(filter_obj)
+        
+        property_name = self.reverse_property_mappings.get(readable_name, readable_name)
+        translated_filter = {**filter_obj, "propertyName": property_name}
+        
+        # Translate filter values against the HubSpot property name
+        if "value" in filter_obj:
+            translated_filter["value"] = self.translate_property_value(property_name, filter_obj["value"], reverse=True)
+        if "values" in filter_obj:
+            translated_filter["values"] = [
+                self.translate_property_value(property_name, val, reverse=True)
+                for val in filter_obj["values"]
+            ]
+        
+        return translated_filter
     
     def _format_date(self, date_value: str) -> str:
         """Format date string for better readability"""
         try:
             # HubSpot dates are typically in milliseconds timestamp format
             if date_value.isdigit():
-                from datetime import datetime
                 timestamp = int(date_value) / 1000
                 dt = datetime.fromtimestamp(timestamp)
                 return dt.strftime("%Y-%m-%d %H:%M:%S")
@@ -157,19 +213,18 @@ class PropertyTranslator:
     def _format_number(self, number_value: str) -> str:
         """Format number for better readability"""
         try:
-            num = float(number_value)
-            if num >= 1000000:
-                return f"{num/1000000:.1f}M"
-            elif num >= 1000:
-                return f"{num/1000:.1f}K"
-            else:
-                return f"{int(num):,}"
-        except (ValueError, TypeError):
+            return _format_number_value(number_value)
+        except TypeError:
+            # Unhashable values can't go through the cache
             return str(number_value)
     
     def get_hubspot_property_name(self, readable_name: str) -> str:
         """Get HubSpot property name from readable name"""
-        return self.reverse_property_mappings.get(readable_name, readable_name.lower().replace(" ", "_"))
+        hubspot_name = self.reverse_property_mappings.get(readable_name)
+        if hubspot_name is None:
+            # Only build the snake_case fallback when there's no mapping
+            hubspot_name = readable_name.lower().replace(" ", "_")
+        return hubspot_name
     
     def get_available_properties(self) -> Dict[str, str]:
         """Get all available property mappings"""
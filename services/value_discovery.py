@@ -2,17 +2,120 @@
 Value Discovery Service for mapping human-readable property values to internal HubSpot values
 """
 
+import asyncio
+import bisect
+import difflib
+import logging
+import math
+import orjson
+import os
 import time
-from typing import Dict, List, Any, Optional
+from collections import deque
+from typing import Dict, List, Any, AsyncIterator, Iterator, Optional, Tuple
+from config.settings import settings
 from .hubspot_client import HubSpotClient
 
+logger = logging.getLogger(__name__)
+
+# Minimum similarity (0-1) for the opt-in fuzzy fallback in map_value_to_internal; high
+# enough that only typos and near-spellings of a label match
+_FUZZY_MATCH_CUTOFF = 0.85
+# difflib's ratio is at most 2*shorter/(shorter+longer), so a label can only reach the
+# cutoff if its length is within this factor of the value's
+_FUZZY_LENGTH_FACTOR = (2 - _FUZZY_MATCH_CUTOFF) / _FUZZY_MATCH_CUTOFF
+# Fuzzy results (misses included) remembered per property before the memo starts over
+_FUZZY_MEMO_MAX_ENTRIES = 1024
+
+# Separates labels in the keyword-search corpus; can't occur in a search keyword match
+_CORPUS_SEPARATOR = "\x00"
+
+# Owners are shared by every object type, so they're cached once under their own key
+_OWNERS_CACHE_KEY = "owners"
+
+# Discovered mappings are saved here so a restarted process can serve them without refetching
+_VALUE_CACHE_FILE = settings.VALUE_CACHE_FILE
+
+# Upper bound on cached mappings (owners plus one entry per object type, custom objects included)
+_VALUE_CACHE_MAX_ENTRIES = 64
+
+# Discovery requests (owners/properties) are throttled to stay under HubSpot's burst limit
+# and capped in flight, leaving headroom for user-facing search traffic
+_DISCOVERY_RATE_LIMIT = 9
+_DISCOVERY_RATE_WINDOW_SECONDS = 5
+_DISCOVERY_CONCURRENCY = 5
+
+# HubSpot webhook subscription prefixes -> the object type whose value mappings they affect
+_WEBHOOK_OBJECT_TYPES = {
+    "company": "companies",
+    "contact": "contacts",
+    "deal": "deals",
+    "ticket": "tickets"
+}
+
+
+class _RateLimiter:
+    """Sliding-window limiter: at most `limit` acquisitions in any `window` seconds"""
+    
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._timestamps = deque()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until another request fits in the window, then record it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= self.window:
+                    self._timestamps.popleft()
+                
+                if len(self._timestamps) < self.limit:
+                    self._timestamps.append(now)
+                    return
+                
+                await asyncio.sleep(self.window - (now - self._timestamps[0]))
+
+
+# Shared by every ValueDiscoveryService instance, since they all draw on the same HubSpot quota
+_discovery_rate_limiter = _RateLimiter(_DISCOVERY_RATE_LIMIT, _DISCOVERY_RATE_WINDOW_SECONDS)
+_discovery_semaphore = asyncio.Semaphore(_DISCOVERY_CONCURRENCY)
+
 
 class ValueDiscoveryService:
+    # Caches are process-wide: main.py, QueryParser and every EncyclopediaService create their
+    # own instance, and all of them should share (and persist) one copy of the mappings
+    _value_cache: Dict[str, Dict[str, Any]] = {}
+    _cache_expiry: Dict[str, float] = {}
+    # object_type -> (value mappings the index was built from, {property_name: index})
+    _property_indexes: Dict[str, Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, Any]]]] = {}
+    # object_type -> (value mappings, lowercased label corpus, entry start offsets, entries)
+    _search_corpora: Dict[str, Tuple[Any, ...]] = {}
+    # (object_type, property_name) -> (expiry, property index): one lookup for the map_* hot path
+    _property_view: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+    # Background refreshes in flight, so expired entries are refetched once
+    _refresh_tasks: Dict[str, asyncio.Task] = {}
+    # Total values per cached object type, counted during discovery (for refresh_cache)
+    _value_counts: Dict[str, int] = {}
+    # HubSpot fetches in flight by cache key, so concurrent misses share one request
+    _inflight_fetches: Dict[str, asyncio.Task] = {}
+    # The saved cache is read once per process, by the first instance
+    _persisted_cache_loaded = False
+    # Saves run in a worker thread; one at a time, in the order their snapshots were taken
+    _persist_lock = asyncio.Lock()
+    
     def __init__(self):
         self.hubspot_client = HubSpotClient()
-        self._value_cache = {}
-        self._cache_expiry = {}
-        self.CACHE_DURATION = 3600  # 1 hour
+        # Cache lifetimes per kind of mapping: owners change rarely, option lists can churn
+        self.CACHE_DURATIONS = {
+            "owners": 6 * 3600,  # 6 hours
+            "properties": 3600  # 1 hour
+        }
+        self.STALE_DURATION = 2 * 3600  # serve stale value mappings while refreshing, up to 2 hours old
+        if not ValueDiscoveryService._persisted_cache_loaded:
+            ValueDiscoveryService._persisted_cache_loaded = True
+            self._load_persisted_cache()
+        self.OWNERS_PAGE_SIZE = 500  # HubSpot's maximum page size for owners
     
     async def discover_all_property_values(self, object_type: str = "companies") -> Dict[str, Dict[str, str]]:
         """
@@ -30,70 +133,150 @@ class ValueDiscoveryService:
         if self._is_cache_valid(cache_key):
             return self._value_cache.get(cache_key, {})
         
+        # Expired but recent enough: serve it and refresh in the background
+        if self._is_cache_usable_stale(cache_key, "properties"):
+            if object_type not in self._refresh_tasks:
+                self._refresh_tasks[object_type] = asyncio.create_task(self._background_refresh(object_type))
+            return self._value_cache[cache_key]
+        
+        return await self._fetch_and_cache_values(object_type)
+    
+    async def _background_refresh(self, object_type: str):
+        """Refresh expired value mappings without blocking callers; failures keep the stale copy"""
+        try:
+            await self._fetch_and_cache_values(object_type)
+        finally:
+            self._refresh_tasks.pop(object_type, None)
+    
+    async def _fetch_and_cache_values(self, object_type: str) -> Dict[str, Dict[str, str]]:
+        """Fetch value mappings for an object type and cache them (best effort: on failure the
+        cached entry is left alone and returned as is, or {} if there is none)"""
+        return await self._coalesced(f"{object_type}_values", lambda: self._discover_and_cache_values(object_type))
+    
+    async def _discover_and_cache_values(self, object_type: str) -> Dict[str, Dict[str, str]]:
+        """Uncoalesced body of _fetch_and_cache_values"""
+        cache_key = f"{object_type}_values"
         all_value_mappings = {}
         
         try:
-            # Get owners mapping (applies to all object types)
-            owners_mapping = await self._discover_owners()
+            # Owners (applies to all object types) and property-specific option values are
+            # independent requests, so fetch them concurrently
+            owners_mapping, discovered_options = await asyncio.gather(
+                self._get_owners(),
+                self._discover_property_options(object_type)
+            )
+            
+            # A partial result would replace good mappings for an hour; keep serving what's cached
+            if owners_mapping is None or discovered_options is None:
+                return self._value_cache.get(cache_key, {})
+            
+            property_options, total_values = discovered_options
             if owners_mapping:
-                all_value_mappings["hubspot_owner_id"] = owners_mapping
-                all_value_mappings["company_owner"] = owners_mapping  # Alternative field name
+                for owner_property in ("hubspot_owner_id", "company_owner"):  # company_owner is an alternative field name
+                    all_value_mappings[owner_property] = owners_mapping
+                    # Property options replace the owners mapping if the object type defines the same name
+                    if owner_property not in property_options:
+                        total_values += len(owners_mapping)
             
-            # Get property-specific option values
-            property_options = await self._discover_property_options(object_type)
             all_value_mappings.update(property_options)
             
-            # Cache the results
-            self._value_cache[cache_key] = all_value_mappings
-            self._cache_expiry[cache_key] = time.time() + self.CACHE_DURATION
+            # Cache the results, counting values as they were gathered rather than re-walking them
+            self._store_in_cache(cache_key, all_value_mappings, "properties")
+            self._value_counts[cache_key] = total_values
+            await self._persist_cache()
             
             return all_value_mappings
             
         except Exception as e:
-            print(f"Warning: Could not discover property values for {object_type}: {e}")
-            return {}
+            logger.warning("Could not discover property values for %s: %s", object_type, e)
+            return self._value_cache.get(cache_key, {})
     
-    async def _discover_owners(self) -> Dict[str, str]:
+    async def _get_owners(self) -> Optional[Dict[str, str]]:
+        """Owners mapping from cache, refetched once its (longer) lifetime runs out (None if that fails)"""
+        if self._is_cache_valid(_OWNERS_CACHE_KEY):
+            return self._value_cache[_OWNERS_CACHE_KEY]
+        
+        # Object types discovered concurrently all need owners; fetch them once
+        return await self._coalesced(_OWNERS_CACHE_KEY, self._discover_and_cache_owners)
+    
+    async def _discover_and_cache_owners(self) -> Optional[Dict[str, str]]:
+        """Uncoalesced body of _get_owners' fetch"""
+        owners_mapping = await self._discover_owners()
+        if owners_mapping is not None:
+            self._store_in_cache(_OWNERS_CACHE_KEY, owners_mapping, "owners")
+        return owners_mapping
+    
+    async def _coalesced(self, cache_key: str, fetch):
+        """
+        Run a fetch once for all concurrent callers with the same cache key
+        
+        Args:
+            cache_key: Key identifying the fetch
+            fetch: Zero-argument coroutine function doing the actual work
+        
+        Returns:
+            The fetch's result, shared by every caller that arrived while it ran
+        """
+        task = self._inflight_fetches.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight_fetches[cache_key] = task
+            
+            def _forget(finished_task, cache_key=cache_key):
+                if self._inflight_fetches.get(cache_key) is finished_task:
+                    del self._inflight_fetches[cache_key]
+            
+            task.add_done_callback(_forget)
+        
+        # Shielded so one caller being cancelled doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+    
+    async def _discover_owners(self) -> Optional[Dict[str, str]]:
         """
         Discover HubSpot owners mapping: name -> owner_id
         
         Returns:
-            Dictionary mapping owner names to owner IDs
+            Dictionary mapping owner names to owner IDs, or None if the owners couldn't be fetched
         """
         try:
-            # Fetch owners from HubSpot Owners API
-            response = await self.hubspot_client._make_request("GET", "/crm/v3/owners")
-            owners = response.get("results", [])
-            
-            owner_mapping = {}
-            for owner in owners:
-                owner_id = owner.get("id")
-                first_name = owner.get("firstName", "")
-                last_name = owner.get("lastName", "")
-                email = owner.get("email", "")
-                
-                if owner_id:
-                    # Create multiple mapping variations
-                    full_name = f"{first_name} {last_name}".strip()
-                    if full_name:
-                        owner_mapping[full_name] = owner_id
-                    
-                    if first_name:
-                        owner_mapping[first_name] = owner_id
-                    
-                    if email:
-                        owner_mapping[email] = owner_id
-                        # Also map email username part
-                        username = email.split("@")[0]
-                        owner_mapping[username] = owner_id
+            # Fetch owners from HubSpot Owners API, following every page; later names overwrite earlier ones
+            owner_mapping = {
+                name: owner_id
+                async for owner in self._paged("/crm/v3/owners", {"limit": self.OWNERS_PAGE_SIZE, "archived": "false"})
+                for name, owner_id in self._owner_entries(owner)
+            }
             
             return owner_mapping
             
         except Exception as e:
-            print(f"Warning: Could not fetch owners: {e}")
-            return {}
+            logger.warning("Could not fetch owners: %s", e)
+            return None
+    
+    @staticmethod
+    def _owner_entries(owner: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+        """Yield the (name variation, owner_id) pairs an owner is looked up by"""
+        owner_id = owner.get("id")
+        if not owner_id:
+            return
+        
+        first_name = owner.get("firstName", "")
+        last_name = owner.get("lastName", "")
+        email = owner.get("email", "")
+        
+        # Create multiple mapping variations
+        full_name = f"{first_name} {last_name}".strip()
+        if full_name:
+            yield full_name, owner_id
+        
+        if first_name:
+            yield first_name, owner_id
+        
+        if email:
+            yield email, owner_id
+            # Also map email username part
+            yield email.split("@")[0], owner_id
     
-    async def _discover_property_options(self, object_type: str) -> Dict[str, Dict[str, str]]:
+    async def _discover_property_options(self, object_type: str) -> Optional[Tuple[Dict[str, Dict[str, str]], int]]:
         """
         Discover property option values for properties that have predefined options
         
@@ -101,16 +284,16 @@ class ValueDiscoveryService:
             object_type: HubSpot object type
         
         Returns:
-            Dictionary mapping property_name -> {option_label: option_value}
+            Tuple of (dictionary mapping property_name -> {option_label: option_value}, total option count),
+            or None if the properties couldn't be fetched
         """
         try:
-            # Get all properties for this object type
-            response = await self.hubspot_client._make_request("GET", f"/crm/v3/properties/{object_type}")
-            properties = response.get("results", [])
-            
             property_options = {}
+            option_count = 0
             
-            for prop in properties:
+            # Get all active properties for this object type; archived properties can't be
+            # filtered on, so there's no point downloading and parsing their options
+            async for prop in self._paged(f"/crm/v3/properties/{object_type}", {"archived": "false"}):
                 property_name = prop.get("name")
                 field_type = prop.get("type")
                 options = prop.get("options", [])
@@ -123,23 +306,49 @@ class ValueDiscoveryService:
                     option_mapping = {}
                     
                     for option in options:
-                        label = option.get("label", "")
+                        # Store each option once under its cleaned label; case and
+                        # whitespace variations are handled at lookup time
+                        label = (option.get("label") or "").strip()
                         value = option.get("value", "")
                         
                         if label and value:
                             option_mapping[label] = value
-                            # Also map lowercase and cleaned versions
-                            option_mapping[label.lower()] = value
-                            option_mapping[label.strip()] = value
                     
                     if option_mapping:
                         property_options[property_name] = option_mapping
+                        option_count += len(option_mapping)
             
-            return property_options
+            return property_options, option_count
             
         except Exception as e:
-            print(f"Warning: Could not fetch property options: {e}")
-            return {}
+            logger.warning("Could not fetch property options for %s: %s", object_type, e)
+            return None
+    
+    async def _paged(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every result of a paginated HubSpot GET endpoint, following paging.next.after cursors
+        
+        Args:
+            endpoint: API path, e.g. /crm/v3/owners
+            params: Query parameters for the first page
+        
+        Yields:
+            Individual result objects, one page at a time
+        """
+        params = dict(params or {})
+        
+        while True:
+            async with _discovery_semaphore:
+                await _discovery_rate_limiter.acquire()
+                response = await self.hubspot_client._make_request("GET", endpoint, params=params)
+            
+            for result in response.get("results", []):
+                yield result
+            
+            after = (response.get("paging") or {}).get("next", {}).get("after")
+            if not after:
+                return
+            params["after"] = after
     
     async def get_property_value_mapping(self, object_type: str, property_name: str) -> Dict[str, str]:
         """
@@ -152,10 +361,10 @@ class ValueDiscoveryService:
         Returns:
             Dictionary mapping human-readable labels to internal values
         """
-        all_mappings = await self.discover_all_property_values(object_type)
-        return all_mappings.get(property_name, {})
+        property_index = await self._get_property_index(object_type, property_name)
+        return property_index["mapping"]
     
-    async def map_value_to_internal(self, object_type: str, property_name: str, human_value: str) -> str:
+    async def map_value_to_internal(self, object_type: str, property_name: str, human_value: str, fuzzy: bool = False) -> str:
         """
         Map a human-readable value to its internal representation
         
@@ -163,30 +372,69 @@ class ValueDiscoveryService:
             object_type: HubSpot object type
             property_name: Internal property name
             human_value: Human-readable value to map
+            fuzzy: Also accept the closest label by similarity (typos); off for callers
+                probing labels that may not exist, where a near miss would be a wrong value
         
         Returns:
             Internal value or original value if no mapping found
         """
-        value_mapping = await self.get_property_value_mapping(object_type, property_name)
+        property_index = await self._get_property_index(object_type, property_name)
+        value_mapping = property_index["mapping"]
         
         # Try exact match first
         if human_value in value_mapping:
             return value_mapping[human_value]
         
-        # Try case-insensitive match
-        human_value_lower = human_value.lower()
-        for label, internal_value in value_mapping.items():
-            if label.lower() == human_value_lower:
+        # Try case-insensitive match (labels are stored stripped, so strip the value too)
+        human_value_lower = human_value.strip().lower()
+        if human_value_lower in property_index["lower"]:
+            return property_index["lower"][human_value_lower]
+        
+        # Try partial matches for names (first label in mapping order wins)
+        for label_lower, _, internal_value in property_index["lower_labels"]:
+            if human_value_lower in label_lower or label_lower in human_value_lower:
                 return internal_value
         
-        # Try partial matches for names
-        for label, internal_value in value_mapping.items():
-            if human_value_lower in label.lower() or label.lower() in human_value_lower:
+        # Finally, take the closest label by similarity to absorb typos ("technolgy")
+        if fuzzy:
+            internal_value = self._fuzzy_match(property_index, human_value_lower)
+            if internal_value is not None:
                 return internal_value
         
         # Return original if no mapping found
         return human_value
     
+    @staticmethod
+    def _fuzzy_match(property_index: Dict[str, Any], value_lower: str) -> Optional[str]:
+        """Internal value of the label most similar to value_lower, or None; memoized per property index"""
+        fuzzy_memo = property_index.setdefault("fuzzy_memo", {})
+        if value_lower in fuzzy_memo:
+            return fuzzy_memo[value_lower]
+        
+        labels_by_length = property_index.get("labels_by_length")
+        if labels_by_length is None:
+            labels_by_length = {}
+            for label_lower in property_index["lower"]:
+                labels_by_length.setdefault(len(label_lower), []).append(label_lower)
+            property_index["labels_by_length"] = labels_by_length
+        
+        # Only labels of similar length can reach the cutoff, so only those are scored
+        min_length = math.ceil(len(value_lower) / _FUZZY_LENGTH_FACTOR - 1e-9)
+        max_length = math.floor(len(value_lower) * _FUZZY_LENGTH_FACTOR + 1e-9)
+        candidates = [
+            label_lower
+            for length in range(min_length, max_length + 1)
+            for label_lower in labels_by_length.get(length, ())
+        ]
+        
+        close_matches = difflib.get_close_matches(value_lower, candidates, n=1, cutoff=_FUZZY_MATCH_CUTOFF)
+        internal_value = property_index["lower"][close_matches[0]] if close_matches else None
+        
+        if len(fuzzy_memo) >= _FUZZY_MEMO_MAX_ENTRIES:
+            fuzzy_memo.clear()
+        fuzzy_memo[value_lower] = internal_value
+        return internal_value
+    
     async def map_internal_to_human(self, object_type: str, property_name: str, internal_value: str) -> str:
         """
         Map an internal value to its human-readable representation
@@ -199,15 +447,116 @@ class ValueDiscoveryService:
         Returns:
             Human-readable value or original value if no mapping found
         """
-        value_mapping = await self.get_property_value_mapping(object_type, property_name)
+        property_index = await self._get_property_index(object_type, property_name)
         
-        # Reverse lookup
-        for label, internal_val in value_mapping.items():
-            if internal_val == internal_value:
-                return label
+        # Reverse lookup, falling back to the original if no mapping found
+        return property_index["reverse"].get(internal_value, internal_value)
+    
+    async def _get_property_index(self, object_type: str, property_name: str) -> Dict[str, Any]:
+        """
+        Get lookup structures derived from a property's value mapping, built once per discovery
         
-        # Return original if no mapping found
-        return internal_value
+        Args:
+            object_type: HubSpot object type
+            property_name: Internal property name
+        
+        Returns:
+            Property index (see _build_property_index)
+        """
+        view_key = (object_type, property_name)
+        view_entry = self._property_view.get(view_key)
+        if view_entry is not None and time.monotonic() < view_entry[0]:
+            return view_entry[1]
+        
+        all_mappings, indexes = await self._get_indexed_mappings(object_type)
+        property_index = self._property_index(all_mappings, indexes, property_name)
+        
+        # Only fresh mappings go in the view; stale ones must keep going through discovery
+        # so the background refresh gets triggered
+        expiry_time = self._cache_expiry.get(f"{object_type}_values")
+        if expiry_time is not None and time.monotonic() < expiry_time:
+            self._property_view[view_key] = (expiry_time, property_index)
+        
+        return property_index
+    
+    async def _get_indexed_mappings(self, object_type: str):
+        """Current value mappings for an object type plus the per-property indexes built from them"""
+        all_mappings = await self.discover_all_property_values(object_type)
+        
+        # Rebuild whenever discovery hands back a different mappings object (refresh/expiry)
+        cached = self._property_indexes.get(object_type)
+        if cached is None or cached[0] is not all_mappings:
+            cached = (all_mappings, {})
+            self._property_indexes[object_type] = cached
+        
+        return cached
+    
+    def _property_index(self, all_mappings: Dict[str, Dict[str, str]], indexes: Dict[str, Dict[str, Any]], property_name: str) -> Dict[str, Any]:
+        """Get a property's index, building it on first use"""
+        property_index = indexes.get(property_name)
+        if property_index is None:
+            property_index = self._build_property_index(all_mappings.get(property_name, {}))
+            indexes[property_name] = property_index
+        return property_index
+    
+    @staticmethod
+    def _build_property_index(value_mapping: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Build lookup structures for one property's {label: internal_value} mapping
+        
+        Args:
+            value_mapping: Label to internal value mapping
+        
+        Returns:
+            Dictionary with "mapping" (the mapping itself), "reverse" (internal value -> first label),
+            "lower" (lowercased label -> first internal value) and "lower_labels"
+            ([(lowercased label, label, internal value)] in mapping order). prefix_lookup
+            adds a sorted view and the fuzzy stage a length bucketing and memo on first use
+        """
+        reverse = {}
+        lower = {}
+        lower_labels = []
+        for label, internal_value in value_mapping.items():
+            label_lower = label.lower()
+            reverse.setdefault(internal_value, label)
+            lower.setdefault(label_lower, internal_value)
+            lower_labels.append((label_lower, label, internal_value))
+        
+        return {
+            "mapping": value_mapping,
+            "reverse": reverse,
+            "lower": lower,
+            "lower_labels": lower_labels
+        }
+    
+    async def prefix_lookup(self, object_type: str, property_name: str, prefix: str) -> List[Tuple[str, str]]:
+        """
+        Find a property's values whose label starts with a prefix (case-insensitive), e.g. for autocomplete
+        
+        Args:
+            object_type: HubSpot object type
+            property_name: Internal property name
+            prefix: Label prefix typed so far
+        
+        Returns:
+            List of (label, internal_value) pairs in lowercased-label order
+        """
+        property_index = await self._get_property_index(object_type, property_name)
+        
+        # Labels sorted by lowercased form, so all matches for a prefix sit in one contiguous run
+        if "prefix_keys" not in property_index:
+            sorted_labels = sorted(property_index["lower_labels"], key=lambda entry: entry[0])
+            property_index["prefix_entries"] = [(label, internal_value) for _, label, internal_value in sorted_labels]
+            property_index["prefix_keys"] = [label_lower for label_lower, _, _ in sorted_labels]
+        
+        prefix_keys = property_index["prefix_keys"]
+        prefix_lower = prefix.lower()
+        start = bisect.bisect_left(prefix_keys, prefix_lower)
+        end = start
+        while end < len(prefix_keys) and prefix_keys[end].startswith(prefix_lower):
+            end += 1
+        
+        return property_index["prefix_entries"][start:end]
     
     async def search_values_by_keyword(self, object_type: str, keyword: str) -> Dict[str, Dict[str, str]]:
         """
@@ -224,25 +573,171 @@ class ValueDiscoveryService:
         matching_values = {}
         
         keyword_lower = keyword.lower()
+        if _CORPUS_SEPARATOR in keyword_lower:
+            return matching_values
         
-        for property_name, value_mapping in all_mappings.items():
-            matches = {}
-            for label, internal_value in value_mapping.items():
-                if keyword_lower in label.lower():
-                    matches[label] = internal_value
+        corpus, starts, entries = self._get_search_corpus(object_type, all_mappings)
+        if not entries:
+            return matching_values
+        
+        # Scan every label at once with str.find; after a hit, resume at the next label
+        position = corpus.find(keyword_lower)
+        while position != -1:
+            entry_number = bisect.bisect_right(starts, position) - 1
+            property_name, label, internal_value = entries[entry_number]
+            matching_values.setdefault(property_name, {})[label] = internal_value
             
-            if matches:
-                matching_values[property_name] = matches
+            if entry_number + 1 == len(starts):
+                break
+            position = corpus.find(keyword_lower, starts[entry_number + 1])
         
         return matching_values
     
+    def _get_search_corpus(self, object_type: str, all_mappings: Dict[str, Dict[str, str]]):
+        """
+        Lowercased labels of every property joined into one string for single-pass keyword search
+        
+        Args:
+            object_type: HubSpot object type
+            all_mappings: Current value mappings for the object type
+        
+        Returns:
+            Tuple of (corpus, start offset of each label, (property_name, label, internal_value) per label)
+        """
+        cached = self._search_corpora.get(object_type)
+        if cached is not None and cached[0] is all_mappings:
+            return cached[1:]
+        
+        starts = []
+        entries = []
+        labels_lower = []
+        offset = 0
+        for property_name, value_mapping in all_mappings.items():
+            for label, internal_value in value_mapping.items():
+                label_lower = label.lower()
+                starts.append(offset)
+                entries.append((property_name, label, internal_value))
+                labels_lower.append(label_lower)
+                offset += len(label_lower) + len(_CORPUS_SEPARATOR)
+        corpus = _CORPUS_SEPARATOR.join(labels_lower)
+        
+        self._search_corpora[object_type] = (all_mappings, corpus, starts, entries)
+        return corpus, starts, entries
+    
     def _is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid"""
+        # Entries are stored and evicted together with their expiry, so one lookup answers both
+        expiry_time = self._cache_expiry.get(cache_key)
+        return expiry_time is not None and time.monotonic() < expiry_time
+    
+    def _is_cache_usable_stale(self, cache_key: str, category: str) -> bool:
+        """Check if expired cached data is still recent enough to serve while refreshing"""
         if cache_key not in self._value_cache:
             return False
         
         expiry_time = self._cache_expiry.get(cache_key, 0)
-        return time.time() < expiry_time
+        return time.monotonic() < expiry_time - self.CACHE_DURATIONS[category] + self.STALE_DURATION
+    
+    def _store_in_cache(self, cache_key: str, value: Dict[str, Any], category: str):
+        """Cache a mapping with the lifetime configured for its category ("owners" or "properties")"""
+        self._value_cache[cache_key] = value
+        self._property_view.clear()
+        # Monotonic clock, so wall-clock adjustments can't extend or cut short a lifetime
+        self._cache_expiry[cache_key] = time.monotonic() + self.CACHE_DURATIONS[category]
+        
+        # Past the bound, drop whichever entry expires first
+        if len(self._value_cache) > _VALUE_CACHE_MAX_ENTRIES:
+            evicted_key = min(self._cache_expiry, key=self._cache_expiry.get)
+            del self._value_cache[evicted_key]
+            del self._cache_expiry[evicted_key]
+            if evicted_key.endswith("_values"):
+                self._property_indexes.pop(evicted_key[:-len("_values")], None)
+                self._search_corpora.pop(evicted_key[:-len("_values")], None)
+                self._value_counts.pop(evicted_key, None)
+    
+    async def _persist_cache(self):
+        """
+        Save cached mappings with their wall-clock expiry times, replacing the file atomically
+        
+        The snapshot is taken on the event loop; serializing and writing it happen in a
+        worker thread so concurrent requests aren't stalled by the file I/O
+        """
+        now_wall = time.time()
+        now_monotonic = time.monotonic()
+        entries = {
+            cache_key: {
+                "value": value,
+                "expires_at": now_wall + (self._cache_expiry[cache_key] - now_monotonic)
+            }
+            for cache_key, value in self._value_cache.items()
+        }
+        
+        async with self._persist_lock:
+            await asyncio.to_thread(self._write_cache_file, entries)
+    
+    @staticmethod
+    def _write_cache_file(entries: Dict[str, Dict[str, Any]]):
+        """Serialize cache entries and replace the cache file with them (runs in a worker thread)"""
+        temp_path = f"{_VALUE_CACHE_FILE}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(orjson.dumps({"entries": entries}))
+            os.replace(temp_path, _VALUE_CACHE_FILE)
+        except (OSError, TypeError) as e:
+            logger.warning("Could not save value cache: %s", e)
+    
+    def _load_persisted_cache(self):
+        """Restore mappings saved by a previous process, skipping any too old to serve even stale"""
+        if not os.path.exists(_VALUE_CACHE_FILE):
+            return
+        
+        try:
+            with open(_VALUE_CACHE_FILE, 'rb') as f:
+                entries = orjson.loads(f.read()).get("entries", {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Could not load value cache: %s", e)
+            return
+        
+        if not isinstance(entries, dict):
+            logger.warning("Could not load value cache: unexpected format")
+            return
+        
+        now_wall = time.time()
+        now_monotonic = time.monotonic()
+        for cache_key, entry in entries.items():
+            # A malformed entry is skipped rather than failing startup (instances are created at import)
+            try:
+                value = entry["value"]
+                remaining = float(entry["expires_at"]) - now_wall
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Skipping malformed value cache entry %r: %s", cache_key, e)
+                continue
+            
+            if isinstance(value, dict) and remaining > -self.STALE_DURATION:
+                self._value_cache[cache_key] = value
+                self._cache_expiry[cache_key] = now_monotonic + remaining
+    
+    async def refresh_if_expiring_within(self, seconds: float) -> List[str]:
+        """
+        Refetch cached object types whose value mappings expire within the given window,
+        so callers keep hitting the cache instead of waiting on an expired entry
+        
+        Args:
+            seconds: Look-ahead window in seconds
+        
+        Returns:
+            Object types that were refreshed
+        """
+        deadline = time.monotonic() + seconds
+        expiring = [
+            cache_key[:-len("_values")]
+            for cache_key, expiry_time in self._cache_expiry.items()
+            if cache_key.endswith("_values") and expiry_time <= deadline
+        ]
+        
+        # Current entries stay in place (and keep serving) until the refetch replaces them
+        await asyncio.gather(*(self._fetch_and_cache_values(obj_type) for obj_type in expiring))
+        return expiring
     
     async def refresh_cache(self, object_type: str = None) -> Dict[str, int]:
         """
@@ -261,20 +756,64 @@ class ValueDiscoveryService:
         else:
             object_types = ["companies", "contacts", "deals", "tickets"]
         
+        # Owners are cached separately from the object types, so a forced refresh clears them too
+        for cache_key in [_OWNERS_CACHE_KEY] + [f"{obj_type}_values" for obj_type in object_types]:
+            self._invalidate(cache_key)
+        
+        # Fetch fresh data for all object types concurrently
+        await asyncio.gather(*(
+            self.discover_all_property_values(obj_type) for obj_type in object_types
+        ))
+        
         for obj_type in object_types:
-            cache_key = f"{obj_type}_values"
-            
-            # Clear cache for this object type
-            if cache_key in self._value_cache:
-                del self._value_cache[cache_key]
-            if cache_key in self._cache_expiry:
-                del self._cache_expiry[cache_key]
-            
-            # Fetch fresh data
-            mappings = await self.discover_all_property_values(obj_type)
-            
-            # Count total values across all properties
-            total_values = sum(len(values) for values in mappings.values())
-            results[obj_type] = total_values
+            # Total values across all properties, counted during discovery (0 if it failed)
+            results[obj_type] = self._value_counts.get(f"{obj_type}_values", 0)
+        
+        return results
+    
+    async def on_webhook(self, event: Dict[str, Any]) -> List[str]:
+        """
+        Invalidate the cached mappings a HubSpot webhook event makes out of date, so the
+        change is picked up on the next lookup instead of when the entry expires
+        
+        Args:
+            event: One webhook event as delivered by HubSpot (needs "subscriptionType")
+        
+        Returns:
+            Cache keys that were invalidated
+        """
+        invalidated = [cache_key for cache_key in self._cache_keys_for_event(event) if self._invalidate(cache_key)]
+        if invalidated:
+            # Keep a restart from reloading what was just invalidated
+            await self._persist_cache()
+        return invalidated
+    
+    def _cache_keys_for_event(self, event: Dict[str, Any]) -> List[str]:
+        """Cache keys affected by a webhook event; record-level changes affect none"""
+        subscription_type = event.get("subscriptionType") or ""
+        prefix, _, change = subscription_type.partition(".")
         
-        return results
\ No newline at end of file
+        # Every object type's mappings embed the owners, so owner changes touch all of them
+        if prefix == "owner":
+            return [_OWNERS_CACHE_KEY] + [key for key in self._value_cache if key.endswith("_values")]
+        
+        if "propertyDefinition" not in change:
+            return []
+        
+        object_type = _WEBHOOK_OBJECT_TYPES.get(prefix) or _WEBHOOK_OBJECT_TYPES.get(str(event.get("objectType") or "").lower())
+        if object_type:
+            return [f"{object_type}_values"]
+        
+        # Definition change for an object type we can't tell apart: drop all option lists
+        return [key for key in self._value_cache if key.endswith("_values")]
+    
+    def _invalidate(self, cache_key: str) -> bool:
+        """Drop a cached mapping and everything derived from it; returns whether it was cached"""
+        was_cached = self._value_cache.pop(cache_key, None) is not None
+        self._property_view.clear()
+        self._cache_expiry.pop(cache_key, None)
+        self._value_counts.pop(cache_key, None)
+        if cache_key.endswith("_values"):
+            self._property_indexes.pop(cache_key[:-len("_values")], None)
+            self._search_corpora.pop(cache_key[:-len("_values")], None)
+        return was_cached